@@ -14,12 +14,19 @@ setup(
         "requests==2.31.0",
         "backoff==2.2.1",
         "python-dateutil==2.8.2",
+        "ciso8601==2.3.1",
+        "ijson==3.3.0",
+        "orjson==3.10.7",
+        "msgspec==0.18.6",
     ],
     extras_require={
         "dev": [
             "pytest",
             "pylint",
-        ]
+        ],
+        "http2": [
+            "httpx[http2]==0.27.2",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -2,25 +2,98 @@
 
 Handles OAuth 2.0 client credentials authentication, token refresh,
 OData pagination via @odata.nextLink, and retry with backoff.
+
+When ijson is installed, entity pages are stream-parsed straight off the
+socket so only one record (plus parser state) is held in memory at a time.
+
+Set "http2": true in config (requires the httpx[http2] extra) to send all
+requests over a multiplexed HTTP/2 connection instead of requests' HTTP/1.1
+connection pool -- useful when many streams sync in parallel.
 """
 
 import math
+import queue
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from email.utils import parsedate_to_datetime
 
 import backoff
 import requests
 import singer
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util import Retry
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # Not orjson.loads: it turns integers beyond 64 bits into floats
+    import msgspec
+except ImportError:
+    msgspec = None
 
 LOGGER = singer.get_logger()
 
 TOKEN_URL_TEMPLATE = "https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
 API_PATH = "/data"
 
+# Config validators
+_URL_RE = re.compile(r'^https?://')
+_TENANT_RE = re.compile(r'^[a-zA-Z0-9._-]+$')
+
 # OData max page size supported by D365 F&O
 MAX_PAGE_SIZE = 10000
 
+# Connection pool sizing: one pool per host (Azure AD token endpoint and
+# the D365 environment), each holding several keep-alive connections.
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+# Transport-level retries for connection/read errors only. These run inside
+# urllib3 on the pooled connection; 429/5xx responses are retried once, by
+# the backoff decorators on _get (urllib3 would otherwise also retry 429/503
+# responses that carry Retry-After).
+TRANSPORT_RETRY = Retry(
+    total=5,
+    connect=5,
+    read=5,
+    status=0,
+    backoff_factor=0.5,
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=False,
+)
+
+# Errors raised while a streamed page body is read off the socket (reset
+# connection, read timeout). The page is re-requested up to this many times
+# as long as none of its records has been yielded yet.
+_BODY_READ_ERRORS = (Urllib3HTTPError, requests.ConnectionError)
+STREAM_PAGE_TRIES = 5
+
+# Refresh the token once this fraction of its lifetime has elapsed
+DEFAULT_REFRESH_RATIO = 0.5
+
+# Never use a token closer than this to its expiry, whatever the ratio
+MIN_TOKEN_REMAINING_SECONDS = 30
+
+# Refresh the token in the background this many seconds before it expires
+DEFAULT_REFRESH_BUFFER_SECONDS = 300
+
+# Minimum wait between background refresh attempts (also the retry delay
+# after a failed background refresh)
+MIN_REFRESH_INTERVAL_SECONDS = 30
+
+# Prefetch pipeline: records are handed from the fetch thread to the caller
+# in batches, with at most this many batches buffered between them.
+PREFETCH_QUEUE_SIZE = 2
+PREFETCH_BATCH_SIZE = 1000
+
+_PREFETCH_DONE = object()
+
 
 class Dynamics365AuthError(Exception):
     """Authentication failure."""
@@ -70,6 +143,15 @@ def _parse_retry_after(retry_after_value, default=60):
     return default
 
 
+def _body_preview(resp, limit=500):
+    """Decode only the first `limit` bytes of a response body for error messages.
+
+    Avoids resp.text, which charset-sniffs and decodes the whole body (D365
+    error pages can be multi-MB HTML).
+    """
+    return resp.content[:limit].decode("utf-8", errors="replace")
+
+
 def _log_backoff(details):
     LOGGER.warning(
         "Backing off %.1f seconds after %d tries",
@@ -78,6 +160,110 @@ def _log_backoff(details):
     )
 
 
+class _Http2Reader:
+    """Minimal file-like reader over an httpx streaming response body."""
+
+    def __init__(self, response):
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+        self.decode_content = True  # httpx always decodes Content-Encoding
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _Http2Response:
+    """The subset of the requests.Response API that DynamicsClient uses."""
+
+    def __init__(self, response, stream):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.raw = _Http2Reader(response) if stream else None
+        if not stream:
+            response.read()
+
+    @property
+    def content(self):
+        return self._response.read()
+
+    @property
+    def text(self):
+        self._response.read()
+        return self._response.text
+
+    def json(self):
+        self._response.read()
+        return self._response.json()
+
+    def close(self):
+        self._response.close()
+
+
+class _Http2Session:
+    """requests.Session-like wrapper around an HTTP/2 httpx.Client."""
+
+    def __init__(self):
+        try:
+            import httpx
+        except ImportError:
+            LOGGER.error(
+                "httpx is required for http2. "
+                "Install with: pip install 'tap-dynamics365-erp[http2]'"
+            )
+            raise
+
+        # httpx ignores the Client's http2/limits once a transport is
+        # given, so the pool settings live on the transport
+        self._client = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=POOL_MAXSIZE,
+                    max_keepalive_connections=POOL_MAXSIZE,
+                ),
+                retries=TRANSPORT_RETRY.connect,
+            ),
+        )
+
+    def get(self, url, headers=None, params=None, timeout=None, stream=False):
+        request = self._client.build_request(
+            "GET", url, headers=headers, params=params, timeout=timeout
+        )
+        return _Http2Response(self._client.send(request, stream=stream), stream)
+
+    def post(self, url, data=None, timeout=None):
+        return _Http2Response(self._client.post(url, data=data, timeout=timeout), False)
+
+    def close(self):
+        self._client.close()
+
+
+def _build_session(config):
+    """Build the HTTP session shared by the token endpoint and the data API."""
+    if config.get("http2"):
+        return _Http2Session()
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=TRANSPORT_RETRY,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class DynamicsClient:
     """OData client for D365 Finance & Operations."""
 
@@ -98,34 +284,57 @@ class DynamicsClient:
         self.oauth_token_url = config.get("oauth_token_url")
 
         # Validate environment URL format
-        if not re.match(r'^https?://', self.environment_url):
+        if not _URL_RE.match(self.environment_url):
             raise ValueError(
                 f"environment_url must start with http:// or https://, "
                 f"got: '{self.environment_url}'"
             )
 
         # Validate tenant_id looks like a GUID or domain
-        if not re.match(r'^[a-zA-Z0-9._-]+$', self.tenant_id):
+        if not _TENANT_RE.match(self.tenant_id):
             raise ValueError(
                 f"tenant_id contains invalid characters: '{self.tenant_id}'"
             )
 
-        self._session = requests.Session()
+        # Shared session for both the token endpoint and the data API so
+        # token refreshes reuse pooled keep-alive connections.
+        self._session = _build_session(config)
         self._access_token = None
+        self._auth_header = None
+        self._token_issued_at = 0
+        self._token_lifetime = 0
         self._token_expires_at = 0
+        self._token_refresh_at = 0
+        self._refresh_ratio = float(config.get("oauth_refresh_ratio", DEFAULT_REFRESH_RATIO))
+
+        # Background token refresh (started after the first token is acquired)
+        self._refresh_buffer = int(
+            config.get("oauth_refresh_buffer_seconds", DEFAULT_REFRESH_BUFFER_SECONDS)
+        )
+        self._refresh_lock = threading.Lock()
+        self._refresh_stop = threading.Event()
+        self._refresh_thread = None
 
         self.base_url = f"{self.environment_url}{API_PATH}"
 
+        # Request headers that never change; only Authorization is added per request
+        self._static_headers = {
+            "OData-Version": "4.0",
+            "OData-MaxVersion": "4.0",
+            "Accept": "application/json",
+            # requests decompresses transparently; OData JSON compresses 5-10x
+            "Accept-Encoding": "gzip, deflate",
+            # Suppress instance annotations (@odata.etag etc.) to shrink pages
+            "Prefer": f'odata.maxpagesize={MAX_PAGE_SIZE}, odata.include-annotations="-*"',
+            "User-Agent": self.user_agent,
+        }
+
     # ------------------------------------------------------------------
     # Authentication
     # ------------------------------------------------------------------
 
-    def _ensure_access_token(self):
-        """Obtain or refresh the OAuth 2.0 access token."""
-        # Refresh 30 seconds early to avoid edge-case expiry
-        if self._access_token and time.time() < (self._token_expires_at - 30):
-            return
-
+    def _request_access_token(self):
+        """Request a new OAuth 2.0 access token. Caller must hold _refresh_lock."""
         # Use custom token URL if provided (e.g., for mock API testing),
         # otherwise use the standard Azure AD token endpoint
         if self.oauth_token_url:
@@ -140,7 +349,7 @@ class DynamicsClient:
             "scope": f"{self.environment_url}/.default",
         }
 
-        resp = requests.post(token_url, data=payload, timeout=30)
+        resp = self._session.post(token_url, data=payload, timeout=30)
         if resp.status_code != 200:
             raise Dynamics365AuthError(
                 f"Token request failed ({resp.status_code}): {resp.text}"
@@ -148,19 +357,81 @@ class DynamicsClient:
 
         data = resp.json()
         self._access_token = data["access_token"]
-        self._token_expires_at = time.time() + int(data.get("expires_in", 3600))
+        self._auth_header = f"Bearer {self._access_token}"
+        self._token_lifetime = int(data.get("expires_in", 3600))
+        self._token_issued_at = time.time()
+        self._token_expires_at = self._token_issued_at + self._token_lifetime
+        self._token_refresh_at = min(
+            self._token_issued_at + self._token_lifetime * self._refresh_ratio,
+            self._token_expires_at - MIN_TOKEN_REMAINING_SECONDS,
+        )
         LOGGER.info("OAuth token acquired, expires in %s seconds", data.get("expires_in"))
 
+    def _ensure_access_token(self):
+        """Obtain or refresh the OAuth 2.0 access token.
+
+        Returns the Authorization header value for the current token.
+
+        Normally the background refresh thread keeps the token fresh; the
+        inline refresh here only runs for the first token, after a 401, or
+        if the background refresh fell behind (e.g. clock skew).
+        """
+        with self._refresh_lock:
+            # Refresh once oauth_refresh_ratio of the token lifetime has elapsed
+            if not self._access_token or time.time() >= self._token_refresh_at:
+                self._request_access_token()
+            auth_header = self._auth_header
+
+        self._start_refresh_thread()
+        return auth_header
+
+    def _invalidate_access_token(self):
+        """Discard the current token so the next request re-authenticates."""
+        with self._refresh_lock:
+            self._access_token = None
+            self._auth_header = None
+            self._token_expires_at = 0
+            self._token_refresh_at = 0
+
+    def _start_refresh_thread(self):
+        if self._refresh_thread is not None:
+            return
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="d365-token-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def _background_refresh_at(self):
+        """Time at which the background thread should renew the token."""
+        return min(self._token_refresh_at, self._token_expires_at - self._refresh_buffer)
+
+    def _refresh_loop(self):
+        """Refresh the token shortly before expiry, off the request path."""
+        while not self._refresh_stop.is_set():
+            with self._refresh_lock:
+                wait = self._background_refresh_at() - time.time()
+            if self._refresh_stop.wait(max(wait, MIN_REFRESH_INTERVAL_SECONDS)):
+                return
+
+            try:
+                with self._refresh_lock:
+                    # Skip if an inline refresh already renewed the token
+                    if time.time() >= self._background_refresh_at():
+                        self._request_access_token()
+            except Exception as e:
+                # The inline refresh in _ensure_access_token remains the fallback
+                LOGGER.warning("Background OAuth token refresh failed: %s", e)
+
+    def close(self):
+        """Stop the background token refresh thread and close the session."""
+        self._refresh_stop.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+        self._session.close()
+
     def _get_headers(self):
-        self._ensure_access_token()
-        return {
-            "Authorization": f"Bearer {self._access_token}",
-            "OData-Version": "4.0",
-            "OData-MaxVersion": "4.0",
-            "Accept": "application/json",
-            "Prefer": f"odata.maxpagesize={MAX_PAGE_SIZE}",
-            "User-Agent": self.user_agent,
-        }
+        return {**self._static_headers, "Authorization": self._ensure_access_token()}
 
     # ------------------------------------------------------------------
     # Request helpers
@@ -181,47 +452,69 @@ class DynamicsClient:
     )
     @backoff.on_exception(
         backoff.expo,
-        (requests.ConnectionError, requests.Timeout),
+        (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError),
         max_tries=5,
         on_backoff=_log_backoff,
     )
-    def _make_request(self, url, params=None):
-        """Execute a GET request with retry logic."""
+    def _get(self, url, params=None, stream=False):
+        """Execute a GET request with retry logic and return the checked response.
+
+        With stream=True the body is left unread so the caller can parse it
+        incrementally; error responses are still fully read for the message.
+        """
         headers = self._get_headers()
-        resp = self._session.get(url, headers=headers, params=params, timeout=120)
+        resp = self._session.get(
+            url, headers=headers, params=params, timeout=120, stream=stream
+        )
 
         if resp.status_code == 429:
             wait = _parse_retry_after(resp.headers.get("Retry-After"))
             LOGGER.warning("Rate limited (429). Waiting %s seconds", wait)
             time.sleep(wait)
-            raise Dynamics365RateLimitError(f"429: {resp.text}")
+            raise Dynamics365RateLimitError(f"429: {_body_preview(resp)}")
 
         if resp.status_code == 401:
-            # Force token refresh and retry once
-            self._access_token = None
-            self._ensure_access_token()
-            headers = self._get_headers()
-            resp = self._session.get(url, headers=headers, params=params, timeout=120)
+            # With stream=True the 401's body is unread: read it (it is small)
+            # so closing hands the connection back to the pool instead of
+            # discarding it. Then refresh the token and retry once, swapping
+            # only Authorization
+            _ = resp.content
+            resp.close()
+            self._invalidate_access_token()
+            headers["Authorization"] = self._ensure_access_token()
+            resp = self._session.get(
+                url, headers=headers, params=params, timeout=120, stream=stream
+            )
             if resp.status_code == 401:
-                raise Dynamics365AuthError(f"Authentication failed: {resp.text}")
+                raise Dynamics365AuthError(f"Authentication failed: {_body_preview(resp)}")
 
         if 500 <= resp.status_code < 600:
             raise Dynamics365ServerError(
-                f"Server error {resp.status_code}: {resp.text[:500]}"
+                f"Server error {resp.status_code}: {_body_preview(resp)}"
             )
 
         if 400 <= resp.status_code < 500:
             raise Dynamics365ClientError(
-                f"Client error {resp.status_code}: {resp.text[:500]}"
+                f"Client error {resp.status_code}: {_body_preview(resp)}"
             )
 
+        return resp
+
+    def _make_request(self, url, params=None):
+        """Execute a GET request with retry logic and return the parsed JSON."""
+        resp = self._get(url, params=params)
+        if msgspec is not None:
+            try:
+                return msgspec.json.decode(resp.content)
+            except (msgspec.DecodeError, ValueError):
+                pass  # e.g. NaN or a non-UTF-8 body; let requests handle it
         try:
             return resp.json()
         except ValueError:
             content_type = resp.headers.get("Content-Type", "")
             raise Dynamics365ClientError(
                 f"Expected JSON response but got {content_type}. "
-                f"Status: {resp.status_code}. Body preview: {resp.text[:200]}"
+                f"Status: {resp.status_code}. Body preview: {_body_preview(resp, 200)}"
             )
 
     # ------------------------------------------------------------------
@@ -233,18 +526,134 @@ class DynamicsClient:
         url = f"{self.base_url}/{entity_set_name}"
         return self._make_request(url, params=params)
 
-    def get_all_records(self, entity_set_name, params=None):
-        """Yield all records from an entity set, following @odata.nextLink."""
-        url = f"{self.base_url}/{entity_set_name}"
+    def _stream_page(self, url, params=None):
+        """Yield the records of one page as they are parsed off the socket.
+
+        Returns (via StopIteration) the page's @odata.nextLink, or None.
+        A connection error while reading the body re-requests the page,
+        unless records from it have already been yielded.
+        """
+        for attempt in range(1, STREAM_PAGE_TRIES + 1):
+            resp = self._get(url, params=params, stream=True)
+            # Let urllib3 undo gzip/deflate Content-Encoding before parsing
+            resp.raw.decode_content = True
+
+            next_link = None
+            builder = None
+            yielded = False
+            try:
+                for prefix, event, value in ijson.parse(resp.raw, use_float=True):
+                    if builder is not None:
+                        builder.event(event, value)
+                        if prefix == "value.item" and event == "end_map":
+                            yielded = True
+                            yield builder.value
+                            builder = None
+                    elif prefix == "value.item" and event == "start_map":
+                        builder = ijson.ObjectBuilder()
+                        builder.event(event, value)
+                    elif prefix == "@odata.nextLink" and event == "string":
+                        next_link = value
+            except ijson.JSONError as e:
+                content_type = resp.headers.get("Content-Type", "")
+                raise Dynamics365ClientError(
+                    f"Expected JSON response but got {content_type}. "
+                    f"Status: {resp.status_code}. Parse error: {e}"
+                )
+            except _BODY_READ_ERRORS as e:
+                if yielded or attempt == STREAM_PAGE_TRIES:
+                    raise
+                wait = 2 ** (attempt - 1)
+                LOGGER.warning(
+                    "Reading page failed (%s); retrying in %d seconds (attempt %d of %d)",
+                    e, wait, attempt, STREAM_PAGE_TRIES,
+                )
+                time.sleep(wait)
+                continue
+            finally:
+                resp.close()
+
+            return next_link
+
+    def _fetch_page(self, url, params=None):
+        """Fetch a single page and return (records, next_link)."""
+        data = self._make_request(url, params=params)
+        return data.get("value", []), data.get("@odata.nextLink")
+
+    def get_page(self, entity_set_name, params=None):
+        """Fetch the first page of an entity set as a list.
+
+        Returns (records, next_link); next_link is None when the entity set
+        fits in a single page. Pass it to get_all_records to read the rest.
+        """
+        return self._fetch_page(f"{self.base_url}/{entity_set_name}", params=params)
+
+    def _iter_all_records(self, url, params=None):
+        """Serially yield all records starting at url, following @odata.nextLink."""
         while url:
-            data = self._make_request(url, params=params)
-            records = data.get("value", [])
-            yield from records
+            if ijson is not None:
+                next_link = yield from self._stream_page(url, params=params)
+            else:
+                records, next_link = self._fetch_page(url, params=params)
+                yield from records
 
             # After first page, params are encoded in nextLink
-            url = data.get("@odata.nextLink")
+            url = next_link
             params = None
 
+    def get_all_records(self, entity_set_name, params=None, next_link=None):
+        """Yield all records from an entity set, following @odata.nextLink.
+
+        Pages are fetched on a background thread so the download of the next
+        page overlaps with the caller's processing of the current one. If
+        next_link is given, reading resumes from that page and params is
+        ignored (it is already encoded in the link).
+        """
+        if next_link:
+            url, params = next_link, None
+        else:
+            url = f"{self.base_url}/{entity_set_name}"
+        batches = queue.Queue(maxsize=PREFETCH_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item):
+            # Give up once the consumer has gone away
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                batch = []
+                for record in self._iter_all_records(url, params=params):
+                    batch.append(record)
+                    if len(batch) >= PREFETCH_BATCH_SIZE:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch:
+                    put(batch)
+            finally:
+                put(_PREFETCH_DONE)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(produce)
+            try:
+                while True:
+                    batch = batches.get()
+                    if batch is _PREFETCH_DONE:
+                        break
+                    yield from batch
+            finally:
+                stop.set()
+
+            # Re-raise any error from the fetch thread
+            future.result()
+
     def get_records_with_filter(self, entity_set_name, odata_filter, select=None, orderby=None):
         """Fetch records with an OData $filter, following pagination."""
         params = {"$filter": odata_filter}
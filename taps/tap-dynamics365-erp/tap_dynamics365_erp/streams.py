@@ -17,18 +17,32 @@ important business objects are included:
   - InventoryOnhandEntries / InventoryWarehouses
 """
 
+import functools
 import os
 import json
 
 import singer
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOGGER = singer.get_logger()
 SCHEMAS_DIR = os.path.join(os.path.dirname(__file__), "schemas")
 
 
+@functools.lru_cache(maxsize=None)
 def _load_schema(stream_name):
-    """Load a JSON schema file from the schemas directory."""
+    """Load a JSON schema file from the schemas directory.
+
+    Parsed schemas are cached for the life of the process, so callers must
+    not mutate the returned dict.
+    """
     path = os.path.join(SCHEMAS_DIR, f"{stream_name}.json")
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -221,5 +235,5 @@ def get_stream_config(stream_name):
 
 
 def load_stream_schema(stream_name):
-    """Load and return the JSON schema for a stream."""
+    """Load and return the (cached, read-only) JSON schema for a stream."""
     return _load_schema(stream_name)
@@ -4,23 +4,125 @@ Supports two replication strategies:
   - INCREMENTAL: Uses $filter on a replication_key (e.g. ModifiedDateTime)
     to only fetch records newer than the last bookmark.
   - FULL_TABLE: Fetches all records every run.
+
+Selected streams are independent (separate entity sets and bookmarks), so
+they are synced concurrently on a bounded thread pool
+(config key max_parallel_streams, default 4).
 """
 
+import atexit
+import io
+import itertools
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import simplejson
 import singer
+import singer.messages
 from singer import Transformer, metadata, bookmarks
 from dateutil.parser import parse as parse_dt
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # C ISO-8601 parser (~60x faster than dateutil for strict ISO strings)
+    from ciso8601 import parse_datetime as _fast_parse_dt
+except ImportError:
+    _fast_parse_dt = None
+
 from tap_dynamics365_erp.client import DynamicsClient
 from tap_dynamics365_erp.streams import STREAMS
+from tap_dynamics365_erp.transform import compile_transformer, field_is_selected
 
 LOGGER = singer.get_logger()
 
+DEFAULT_MAX_PARALLEL_STREAMS = 4
+
+# stdout buffer size; RECORD lines are written without a per-line flush
+# and reach the pipe when the buffer fills or a STATE message is written.
+STDOUT_BUFFER_SIZE = 1 << 20
+
+# Intermediate STATE during incremental syncs is emitted at an exponentially
+# growing record interval (10k, then 20k later, 40k later, ...), capped here.
+STATE_INTERVAL_START = 10000
+STATE_INTERVAL_MAX = 1000000
+
+# Singer messages share one stdout and the state dict is shared by all
+# stream workers, so every write (and every bookmark update) holds this lock.
+_OUTPUT_LOCK = threading.Lock()
+
+
+def _buffer_stdout():
+    """Replace stdout with a large-buffered writer on the same file descriptor."""
+    stdout = sys.stdout
+    if getattr(stdout, "_tap_buffered", False):
+        return
+    try:
+        fileno = stdout.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return  # Not a real file (e.g. redirected in-process); leave as is
+
+    stdout.flush()
+    sys.stdout = open(fileno, "w", buffering=STDOUT_BUFFER_SIZE,
+                      encoding="utf-8", closefd=False)
+    sys.stdout._tap_buffered = True
+    # Singer requires every message to be flushed before the tap exits
+    atexit.register(sys.stdout.flush)
+
+
+def _flush_output():
+    with _OUTPUT_LOCK:
+        sys.stdout.flush()
+
+
+def _format_message(message):
+    """Serialize a Singer message as one compact JSON line.
+
+    Messages orjson cannot encode (Decimal values, integers beyond 64 bits)
+    go through simplejson, which keeps Decimals exact like singer does.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(message.asdict()).decode("utf-8")
+        except TypeError:  # orjson.JSONEncodeError
+            pass
+    return simplejson.dumps(message.asdict(), use_decimal=True, separators=(",", ":"))
+
+
+# singer.write_message (used for SCHEMA and STATE) looks format_message up on
+# singer.messages at call time, so all outbound messages use the compact form
+singer.messages.format_message = _format_message
+
+
+def _write_record(stream_name, record, time_extracted):
+    # Same as singer.write_record, minus the flush after every line
+    message = singer.RecordMessage(
+        stream=stream_name, record=record, time_extracted=time_extracted
+    )
+    line = _format_message(message) + "\n"
+    with _OUTPUT_LOCK:
+        sys.stdout.write(line)
+
+
+def _write_bookmark(state, stream_name, replication_key, value, emit=False):
+    """Update a bookmark in the shared state, optionally emitting STATE."""
+    with _OUTPUT_LOCK:
+        state = bookmarks.write_bookmark(state, stream_name, replication_key, value)
+        if emit:
+            singer.write_state(state)
+    return state
+
 
 def _compare_replication_values(value_a, value_b):
     """Compare two replication key values correctly.
 
-    Attempts datetime parsing first (handles ISO 8601 formats),
-    then numeric comparison, falling back to string comparison.
+    Attempts datetime parsing first (ciso8601 for strict ISO 8601, then
+    dateutil for other formats), then numeric comparison, falling back to
+    string comparison.
     Returns True if value_a > value_b.
     """
     if value_a is None:
@@ -30,6 +132,13 @@ def _compare_replication_values(value_a, value_b):
 
     str_a, str_b = str(value_a), str(value_b)
 
+    # Fast path: OData Edm.DateTimeOffset values are strict ISO 8601
+    if _fast_parse_dt is not None:
+        try:
+            return _fast_parse_dt(str_a) > _fast_parse_dt(str_b)
+        except (ValueError, TypeError):
+            pass
+
     # Try datetime comparison (handles ISO 8601, OData datetime formats)
     try:
         dt_a = parse_dt(str_a)
@@ -59,31 +168,70 @@ def _get_selected_streams(catalog):
     return selected
 
 
-def _build_odata_params(stream_config):
+def _select_clause(schema, mdata):
+    """Build an OData $select listing the selected schema fields.
+
+    Returns None when every field is selected, keeping the URL short.
+    """
+    fields = list(schema.get("properties", {}))
+    selected = [f for f in fields if field_is_selected(mdata, f)]
+    if len(selected) == len(fields):
+        return None
+    return ",".join(selected)
+
+
+def _build_odata_params(stream_config, schema, mdata):
     """Build base OData query parameters for a stream."""
     params = {}
     if stream_config.get("cross_company"):
         params["cross-company"] = "true"
+
+    # Only fetch the columns we emit; D365 entities can have 100+ properties
+    select = _select_clause(schema, mdata)
+    if select:
+        params["$select"] = select
     return params
 
 
+def _record_transformer(schema, mdata, transformer):
+    """Return a transform(record) callable for a stream.
+
+    Uses a transformer compiled for the stream's schema when possible,
+    otherwise singer.Transformer.
+    """
+    compiled = compile_transformer(schema, mdata)
+    if compiled is not None:
+        return compiled
+    return lambda record: transformer.transform(record, schema, mdata)
+
+
 def _sync_full_table(client, stream_name, stream_config, schema, mdata, transformer):
     """Sync all records for a FULL_TABLE stream."""
     entity_set = stream_config["entity_set_name"]
-    params = _build_odata_params(stream_config)
+    params = _build_odata_params(stream_config, schema, mdata)
 
     LOGGER.info("FULL_TABLE sync for %s (%s)", stream_name, entity_set)
 
     record_count = 0
     extraction_time = singer.utils.now()
+    transform = _record_transformer(schema, mdata, transformer)
+
+    # Most FULL_TABLE entity sets fit in one page: fetch it as a plain list and
+    # only start the prefetching reader when there are more pages to follow
+    records, next_link = client.get_page(entity_set, params=params)
+    if next_link:
+        records = itertools.chain(
+            records, client.get_all_records(entity_set, next_link=next_link)
+        )
 
-    for record in client.get_all_records(entity_set, params=params):
-        transformed = transformer.transform(record, schema, mdata)
-        singer.write_record(stream_name, transformed, time_extracted=extraction_time)
+    for record in records:
+        transformed = transform(record)
+        _write_record(stream_name, transformed, extraction_time)
         record_count += 1
 
         if record_count % 10000 == 0:
             LOGGER.info("%s: Synced %d records so far...", stream_name, record_count)
+            _flush_output()
 
     LOGGER.info("%s: Completed. Total records: %d", stream_name, record_count)
     return record_count
@@ -93,7 +241,7 @@ def _sync_incremental(client, state, stream_name, stream_config, schema, mdata,
     """Sync records incrementally using $filter on the replication key."""
     entity_set = stream_config["entity_set_name"]
     replication_key = stream_config["replication_key"]
-    params = _build_odata_params(stream_config)
+    params = _build_odata_params(stream_config, schema, mdata)
 
     # Get the bookmark (last synced value for the replication key)
     bookmark_value = bookmarks.get_bookmark(state, stream_name, replication_key)
@@ -115,74 +263,80 @@ def _sync_incremental(client, state, stream_name, stream_config, schema, mdata,
 
     record_count = 0
     max_replication_value = bookmark_value
+    last_written_bookmark = bookmark_value
+    state_interval = STATE_INTERVAL_START
+    next_state_at = state_interval
     extraction_time = singer.utils.now()
+    transform = _record_transformer(schema, mdata, transformer)
 
     for record in client.get_all_records(entity_set, params=params):
-        transformed = transformer.transform(record, schema, mdata)
-        singer.write_record(stream_name, transformed, time_extracted=extraction_time)
+        transformed = transform(record)
+        _write_record(stream_name, transformed, extraction_time)
         record_count += 1
 
-        # Track the maximum replication key value seen
+        # Records arrive ordered by the replication key ($orderby asc), so the
+        # latest value seen is the maximum -- no per-record comparison needed
         record_rep_value = record.get(replication_key)
         if record_rep_value:
-            if _compare_replication_values(record_rep_value, max_replication_value):
-                max_replication_value = str(record_rep_value)
+            max_replication_value = record_rep_value
 
         if record_count % 10000 == 0:
             LOGGER.info("%s: Synced %d records so far...", stream_name, record_count)
-            # Write intermediate bookmark for crash recovery
-            if max_replication_value:
-                state = bookmarks.write_bookmark(
-                    state, stream_name, replication_key, max_replication_value
+
+        if record_count >= next_state_at:
+            # Write intermediate bookmark for crash recovery, unless unchanged
+            if max_replication_value and max_replication_value != last_written_bookmark:
+                state = _write_bookmark(
+                    state, stream_name, replication_key, max_replication_value, emit=True
                 )
-                singer.write_state(state)
+                last_written_bookmark = max_replication_value
+            else:
+                _flush_output()
+            state_interval = min(state_interval * 2, STATE_INTERVAL_MAX)
+            next_state_at += state_interval
+
+    # Never move the bookmark backwards (e.g. if the server ignored $orderby)
+    if _compare_replication_values(bookmark_value, max_replication_value):
+        max_replication_value = bookmark_value
 
     # Write final bookmark
     if max_replication_value:
-        state = bookmarks.write_bookmark(
-            state, stream_name, replication_key, max_replication_value
-        )
+        state = _write_bookmark(state, stream_name, replication_key, max_replication_value)
 
     LOGGER.info("%s: Completed. Total records: %d", stream_name, record_count)
     return state, record_count
 
 
-def sync(config, state, catalog):
-    """Main sync entry point.
-
-    Iterates over selected streams and syncs each one according to its
-    replication method.
-    """
-    client = DynamicsClient(config)
-    selected_streams = _get_selected_streams(catalog)
-
-    if not selected_streams:
-        LOGGER.warning("No streams selected. Exiting sync.")
-        return state
-
-    LOGGER.info("Starting sync for %d selected stream(s)", len(selected_streams))
-
-    for entry in selected_streams:
-        stream_name = entry.tap_stream_id
-        stream_config = STREAMS.get(stream_name)
+def _set_in_flight(state, in_flight):
+    """Record the streams currently being synced. Caller must hold _OUTPUT_LOCK."""
+    if in_flight:
+        state["currently_syncing_streams"] = sorted(in_flight)
+    else:
+        state.pop("currently_syncing_streams", None)
+    singer.write_state(state)
 
-        if not stream_config:
-            LOGGER.warning("Stream %s not found in STREAMS config, skipping", stream_name)
-            continue
 
-        schema = entry.schema.to_dict() if hasattr(entry.schema, "to_dict") else entry.schema
-        mdata = metadata.to_map(entry.metadata)
-        key_properties = stream_config["key_properties"]
-        replication_key = stream_config["replication_key"]
-        replication_method = stream_config["replication_method"]
+def _sync_stream(client, state, entry, in_flight):
+    """Sync a single selected stream. Runs on a worker thread."""
+    stream_name = entry.tap_stream_id
+    stream_config = STREAMS.get(stream_name)
 
-        # Mark stream as currently syncing
-        state = singer.set_currently_syncing(state, stream_name)
-        singer.write_state(state)
+    if not stream_config:
+        LOGGER.warning("Stream %s not found in STREAMS config, skipping", stream_name)
+        return
 
-        # Write schema message
-        # singer.write_schema accepts: stream_name, schema, key_properties, bookmark_properties
-        bookmark_properties = [replication_key] if replication_key else None
+    schema = entry.schema.to_dict() if hasattr(entry.schema, "to_dict") else entry.schema
+    mdata = metadata.to_map(entry.metadata)
+    key_properties = stream_config["key_properties"]
+    replication_key = stream_config["replication_key"]
+    replication_method = stream_config["replication_method"]
+
+    # Mark stream as in flight and write its schema message
+    # singer.write_schema accepts: stream_name, schema, key_properties, bookmark_properties
+    bookmark_properties = [replication_key] if replication_key else None
+    with _OUTPUT_LOCK:
+        in_flight.add(stream_name)
+        _set_in_flight(state, in_flight)
         singer.write_schema(
             stream_name,
             schema,
@@ -190,19 +344,62 @@ def sync(config, state, catalog):
             bookmark_properties=bookmark_properties,
         )
 
-        with Transformer() as transformer:
-            if replication_method == "INCREMENTAL":
-                state, _ = _sync_incremental(
-                    client, state, stream_name, stream_config,
-                    schema, mdata, transformer,
-                )
-            else:
-                _sync_full_table(
-                    client, stream_name, stream_config,
-                    schema, mdata, transformer,
-                )
+    with Transformer() as transformer:
+        if replication_method == "INCREMENTAL":
+            _sync_incremental(
+                client, state, stream_name, stream_config,
+                schema, mdata, transformer,
+            )
+        else:
+            _sync_full_table(
+                client, stream_name, stream_config,
+                schema, mdata, transformer,
+            )
+
+    with _OUTPUT_LOCK:
+        in_flight.discard(stream_name)
+        _set_in_flight(state, in_flight)
 
-        singer.write_state(state)
+
+def sync(config, state, catalog):
+    """Main sync entry point.
+
+    Syncs the selected streams concurrently, each according to its
+    replication method. All workers share one client and one state dict.
+    """
+    client = DynamicsClient(config)
+    _buffer_stdout()
+    selected_streams = _get_selected_streams(catalog)
+
+    if not selected_streams:
+        LOGGER.warning("No streams selected. Exiting sync.")
+        return state
+
+    max_workers = max(1, int(config.get("max_parallel_streams", DEFAULT_MAX_PARALLEL_STREAMS)))
+    LOGGER.info(
+        "Starting sync for %d selected stream(s) with up to %d in parallel",
+        len(selected_streams), max_workers,
+    )
+
+    in_flight = set()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_sync_stream, client, state, entry, in_flight)
+                for entry in selected_streams
+            ]
+            # Re-raise the first worker failure as soon as it happens; streams
+            # not yet started are cancelled, running ones finish first
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        # Stop the background token refresh
+        client.close()
 
     # Clear currently syncing
     state = singer.set_currently_syncing(state, None)
@@ -0,0 +1,159 @@
+"""Schema-specialized record transformer for Dynamics 365 streams.
+
+singer.Transformer walks the JSON schema for every record. D365 stream
+schemas are flat and fixed per stream, so instead we generate a Python
+function once per stream that converts each selected field inline, e.g.:
+
+    def transform(record):
+        out = {}
+        if 'SalesOrderNumber' in record:
+            v = record['SalesOrderNumber']
+            out['SalesOrderNumber'] = None if v is None else (v if v.__class__ is str else str(v))
+        ...
+        return out
+
+Field conversions mirror singer.Transformer (non-null types are tried
+first, then null). Schemas using anything beyond nullable scalar types
+(objects, arrays, anyOf, other formats) are not compiled; callers fall
+back to singer.Transformer for those.
+"""
+
+import singer
+from singer import metadata
+from singer.transform import Error, SchemaMismatch, string_to_datetime
+
+LOGGER = singer.get_logger()
+
+SUPPORTED_TYPES = ("string", "number", "integer", "boolean")
+
+
+def _mismatch(key, value, field_schema):
+    return SchemaMismatch([Error([key], value, field_schema)])
+
+
+def _to_datetime(value, key, field_schema):
+    if value is None or value == "":
+        return None
+    transformed = string_to_datetime(value)
+    if transformed is None:
+        raise _mismatch(key, value, field_schema)
+    return transformed
+
+
+def _to_number(value, key, field_schema):
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", "") if value.__class__ is str else value)
+    except (TypeError, ValueError):
+        if value == "":
+            return None
+        raise _mismatch(key, value, field_schema)
+
+
+def _to_integer(value, key, field_schema):
+    if value is None:
+        return None
+    try:
+        return int(value.replace(",", "") if value.__class__ is str else value)
+    except (TypeError, ValueError):
+        if value == "":
+            return None
+        raise _mismatch(key, value, field_schema)
+
+
+def _to_boolean(value):
+    # singer.Transformer tries boolean before null, so None becomes False
+    if value.__class__ is str and value.lower() == "false":
+        return False
+    return bool(value)
+
+
+def _field_type(field_schema):
+    """Return the single non-null type of a nullable scalar field, else None."""
+    if set(field_schema) - {"type", "format"}:
+        return None
+
+    types = field_schema.get("type")
+    if isinstance(types, str):
+        types = [types]
+    if not isinstance(types, list) or "null" not in types or len(types) != 2:
+        return None
+
+    typ = types[0] if types[1] == "null" else types[1]
+    if typ not in SUPPORTED_TYPES:
+        return None
+
+    fmt = field_schema.get("format")
+    if fmt == "date-time" and typ == "string":
+        return "date-time"
+    if fmt is not None:
+        return None
+    return typ
+
+
+def field_is_selected(mdata, field_name):
+    """Same field filtering as singer.Transformer.filter_data_by_metadata."""
+    breadcrumb = ("properties", field_name)
+    if metadata.get(mdata, breadcrumb, "inclusion") == "automatic":
+        return True
+    if metadata.get(mdata, breadcrumb, "selected") is False:
+        return False
+    return metadata.get(mdata, breadcrumb, "inclusion") != "unsupported"
+
+
+def _conversion(field_type, key_literal, index):
+    """Python expression converting `v` for one field."""
+    if field_type == "string":
+        return "None if v is None else (v if v.__class__ is str else str(v))"
+    if field_type == "boolean":
+        return "_to_boolean(v)"
+    func = {
+        "date-time": "_to_datetime",
+        "number": "_to_number",
+        "integer": "_to_integer",
+    }[field_type]
+    return f"{func}(v, {key_literal}, _FIELD_SCHEMAS[{index}])"
+
+
+def compile_transformer(schema, mdata):
+    """Build a transform(record) function specialized for a stream schema.
+
+    Returns None if the schema uses features the compiled transformer does
+    not support; use singer.Transformer in that case.
+    """
+    properties = schema.get("properties")
+    if not properties or set(schema) - {"type", "properties", "additionalProperties"}:
+        return None
+
+    lines = ["def transform(record):", "    out = {}"]
+    field_schemas = []
+
+    for field_name, field_schema in properties.items():
+        field_type = _field_type(field_schema)
+        if field_type is None:
+            LOGGER.debug("Field '%s' not supported by compiled transformer", field_name)
+            return None
+        if not field_is_selected(mdata, field_name):
+            continue
+
+        key_literal = repr(field_name)
+        lines.append(f"    if {key_literal} in record:")
+        lines.append(f"        v = record[{key_literal}]")
+        lines.append(
+            f"        out[{key_literal}] = "
+            f"{_conversion(field_type, key_literal, len(field_schemas))}"
+        )
+        field_schemas.append(field_schema)
+
+    lines.append("    return out")
+
+    namespace = {
+        "_to_datetime": _to_datetime,
+        "_to_number": _to_number,
+        "_to_integer": _to_integer,
+        "_to_boolean": _to_boolean,
+        "_FIELD_SCHEMAS": field_schemas,
+    }
+    exec(compile("\n".join(lines), "<compiled transformer>", "exec"), namespace)  # pylint: disable=exec-used
+    return namespace["transform"]
@@ -8,8 +8,12 @@ Supported methods:
   - oauth2:       OAuth 2.0 Client Credentials or Refresh Token flow
 """
 
+import contextlib
 import json
+import os
 import sys
+import tempfile
+import threading
 import time
 import logging
 
@@ -18,6 +22,21 @@ from requests.auth import HTTPBasicAuth
 
 LOGGER = logging.getLogger(__name__)
 
+# Serializes HTTP_META lines written from concurrent request threads
+_HTTP_META_LOCK = threading.Lock()
+
+
+def write_http_meta(meta):
+    """Write one HTTP_META: line to stderr with a single write.
+
+    print() writes the text and the newline separately, so lines from
+    concurrent threads could run together and break the Node parser.
+    """
+    line = "HTTP_META:" + json.dumps(meta) + "\n"
+    with _HTTP_META_LOCK:
+        sys.stderr.write(line)
+        sys.stderr.flush()
+
 
 class AuthError(Exception):
     """Raised when authentication fails."""
@@ -26,6 +45,11 @@ class AuthError(Exception):
 class NoAuth:
     """No authentication -- pass-through."""
 
+    __slots__ = ()
+
+    def __init__(self, config=None):
+        pass  # nothing to configure
+
     def apply(self, session, params):
         return params
 
@@ -41,6 +65,8 @@ class ApiKeyAuth:
         api_key_location - "header" (default) or "param"
     """
 
+    __slots__ = ("api_key", "key_name", "location")
+
     def __init__(self, config):
         self.api_key = config["api_key"]
         self.key_name = config.get("api_key_name", "X-API-Key")
@@ -48,7 +74,8 @@ class ApiKeyAuth:
 
     def apply(self, session, params):
         if self.location == "param":
-            params = params or {}
+            if params is None:
+                params = {}
             params[self.key_name] = self.api_key
         else:
             session.headers[self.key_name] = self.api_key
@@ -62,6 +89,8 @@ class BearerTokenAuth:
         bearer_token - The bearer token value
     """
 
+    __slots__ = ("token",)
+
     def __init__(self, config):
         self.token = config["bearer_token"]
 
@@ -78,6 +107,8 @@ class BasicAuth:
         password - The password
     """
 
+    __slots__ = ("username", "password")
+
     def __init__(self, config):
         self.username = config["username"]
         self.password = config["password"]
@@ -103,8 +134,17 @@ class OAuth2Auth:
         oauth2_scope        - OAuth scope(s) (optional)
         oauth2_audience     - Audience claim (optional, for Auth0/etc.)
         oauth2_extra_params - Dict of extra params to send to token endpoint
+        oauth2_token_cache_path - File to persist the token in between runs
+                                  (optional)
     """
 
+    __slots__ = (
+        "token_url", "client_id", "client_secret", "grant_type",
+        "refresh_token", "scope", "audience", "extra_params",
+        "token_cache_path", "_access_token", "_token_expires_at",
+        "_refresh_after", "_lock", "_token_session",
+    )
+
     def __init__(self, config):
         self.token_url = config["oauth2_token_url"]
         self.client_id = config["oauth2_client_id"]
@@ -117,6 +157,75 @@ class OAuth2Auth:
 
         self._access_token = None
         self._token_expires_at = 0
+        # Refresh 60 seconds early to avoid edge-case expiry; precomputed so
+        # the per-request check is a single comparison
+        self._refresh_after = 0
+        # Serializes refreshes so concurrent callers share one token request
+        self._lock = threading.Lock()
+        # Dedicated keep-alive session for the token endpoint: refreshes reuse
+        # one connection, and the API session's Authorization header and
+        # response hooks never touch token requests
+        self._token_session = requests.Session()
+
+        self.token_cache_path = config.get("oauth2_token_cache_path")
+        if self.token_cache_path:
+            self._load_cached_token()
+
+    def _load_cached_token(self):
+        """Reuse a token persisted by a previous run, if it is still valid."""
+        try:
+            with open(self.token_cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            LOGGER.warning("Ignoring unreadable OAuth2 token cache %s: %s",
+                           self.token_cache_path, e)
+            return
+
+        # Only trust a cache written for this token endpoint and client
+        if (cached.get("token_url") != self.token_url
+                or cached.get("client_id") != self.client_id):
+            return
+
+        # A rotated refresh token supersedes the one in config
+        if cached.get("refresh_token"):
+            self.refresh_token = cached["refresh_token"]
+
+        expires_at = cached.get("expires_at", 0)
+        if cached.get("access_token") and expires_at - 60 > time.time():
+            self._access_token = cached["access_token"]
+            self._token_expires_at = expires_at
+            self._refresh_after = expires_at - 60
+            LOGGER.info("Using cached OAuth2 token, expires in %d seconds",
+                        expires_at - time.time())
+
+    def _save_cached_token(self):
+        """Atomically persist the current token (owner-only permissions)."""
+        cached = {
+            "token_url": self.token_url,
+            "client_id": self.client_id,
+            "access_token": self._access_token,
+            "expires_at": self._token_expires_at,
+            "refresh_token": self.refresh_token,
+        }
+        try:
+            # mkstemp always creates a new file (O_EXCL, mode 0600), so a
+            # leftover or planted temp file or symlink is never written through
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.token_cache_path) or ".", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(cached, f)
+                os.replace(tmp_path, self.token_cache_path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            LOGGER.warning("Could not write OAuth2 token cache %s: %s",
+                           self.token_cache_path, e)
 
     def _request_token(self):
         """Request a new access token from the OAuth2 provider."""
@@ -143,7 +252,7 @@ class OAuth2Auth:
         LOGGER.info("Requesting OAuth2 token from %s (grant_type=%s)",
                      self.token_url, self.grant_type)
 
-        resp = requests.post(self.token_url, data=payload, timeout=30)
+        resp = self._token_session.post(self.token_url, data=payload, timeout=30)
 
         # Emit HTTP metadata for the token exchange (auth handshake)
         self._emit_token_meta(resp, payload)
@@ -157,6 +266,7 @@ class OAuth2Auth:
         self._access_token = data["access_token"]
         expires_in = int(data.get("expires_in", 3600))
         self._token_expires_at = time.time() + expires_in
+        self._refresh_after = self._token_expires_at - 60
 
         # If a new refresh token is returned, update it
         if "refresh_token" in data:
@@ -164,22 +274,41 @@ class OAuth2Auth:
 
         LOGGER.info("OAuth2 token acquired, expires in %d seconds", expires_in)
 
+        if self.token_cache_path:
+            self._save_cached_token()
+
+    def _token_valid(self):
+        return time.time() < self._refresh_after
+
     def _ensure_token(self):
-        """Ensure we have a valid (non-expired) token."""
-        # Refresh 60 seconds early to avoid edge-case expiry
-        if self._access_token and time.time() < (self._token_expires_at - 60):
-            return
-        self._request_token()
+        """Return a valid (non-expired) access token, refreshing it if needed.
+
+        The token is read under the lock, so a concurrent force_refresh
+        can never hand back None.
+        """
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self._token_valid():
+                self._request_token()
+            return self._access_token
 
     def apply(self, session, params):
-        self._ensure_token()
-        session.headers["Authorization"] = f"Bearer {self._access_token}"
+        session.headers["Authorization"] = f"Bearer {self._ensure_token()}"
         return params
 
-    def force_refresh(self):
-        """Force a token refresh on next request (e.g., after a 401)."""
-        self._access_token = None
-        self._token_expires_at = 0
+    def force_refresh(self, stale_token=None):
+        """Force a token refresh on next request (e.g., after a 401).
+
+        With stale_token (the token the rejected request was sent with),
+        the token is only discarded if it is still the current one, so
+        concurrent 401s don't throw away a token another thread just got.
+        """
+        with self._lock:
+            if stale_token is not None and stale_token != self._access_token:
+                return
+            self._access_token = None
+            self._token_expires_at = 0
+            self._refresh_after = 0
 
     @staticmethod
     def _emit_token_meta(resp, payload):
@@ -222,11 +351,20 @@ class OAuth2Auth:
                     "body_preview": body_preview,
                 },
             }
-            print(f"HTTP_META:{json.dumps(meta)}", file=sys.stderr, flush=True)
+            write_http_meta(meta)
         except Exception:
             pass  # Never break auth flow for metadata
 
 
+_AUTH_CLASSES = {
+    "no_auth": NoAuth,
+    "api_key": ApiKeyAuth,
+    "bearer_token": BearerTokenAuth,
+    "basic": BasicAuth,
+    "oauth2": OAuth2Auth,
+}
+
+
 def build_auth(config):
     """Factory: build the appropriate auth handler from config.
 
@@ -238,18 +376,11 @@ def build_auth(config):
     """
     auth_method = config.get("auth_method", "no_auth")
 
-    if auth_method == "no_auth":
-        return NoAuth()
-    elif auth_method == "api_key":
-        return ApiKeyAuth(config)
-    elif auth_method == "bearer_token":
-        return BearerTokenAuth(config)
-    elif auth_method == "basic":
-        return BasicAuth(config)
-    elif auth_method == "oauth2":
-        return OAuth2Auth(config)
-    else:
+    try:
+        auth_class = _AUTH_CLASSES[auth_method]
+    except KeyError:
         raise ValueError(
             f"Unknown auth_method: '{auth_method}'. "
-            f"Supported: no_auth, api_key, bearer_token, basic, oauth2"
-        )
+            f"Supported: {', '.join(_AUTH_CLASSES)}"
+        ) from None
+    return auth_class(config)
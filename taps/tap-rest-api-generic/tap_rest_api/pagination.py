@@ -10,12 +10,23 @@ Supported strategies:
   - odata:        OData @odata.nextLink pagination
 
 Each paginator is a generator that yields the full JSON response body
-for each page.
+for each page. get_paginator runs it one page ahead of the caller on a
+worker thread, so the next request is in flight while the current page
+is being processed.
 """
 
+import collections
+import functools
 import logging
+import math
+import types
+from concurrent.futures import ThreadPoolExecutor
 
-from jsonpath_ng import parse as jsonpath_parse
+from tap_rest_api.record_extractor import (
+    COMMON_RECORD_KEYS,
+    compile_jsonpath,
+    extract_records,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +34,12 @@ LOGGER = logging.getLogger(__name__)
 # Prevents infinite loops from misconfigured APIs or extraction bugs.
 MAX_PAGES = 10000
 
+# Concurrent page requests once a response reveals the total record count
+# (stream config: pagination_max_concurrency)
+DEFAULT_MAX_CONCURRENCY = 4
+
+_DONE = object()
+
 
 def _extract_jsonpath(data, expression):
     """Extract a value from a dict using a JSONPath expression.
@@ -30,7 +47,7 @@ def _extract_jsonpath(data, expression):
     Returns the first match or None.
     """
     try:
-        matches = jsonpath_parse(expression).find(data)
+        matches = compile_jsonpath(expression).find(data)
         if matches:
             return matches[0].value
     except Exception as e:
@@ -38,6 +55,65 @@ def _extract_jsonpath(data, expression):
     return None
 
 
+def _count_records(data, records_path):
+    """Count the records on a page, for the short-page stop check."""
+    if records_path:
+        return len(extract_records(data, records_path))
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        for key in COMMON_RECORD_KEYS:
+            value = data.get(key)
+            if isinstance(value, list):
+                return len(value)
+    return 0
+
+
+def _extract_total(data, total_path):
+    """Return the total record count at total_path as an int, or None."""
+    total = _extract_jsonpath(data, total_path)
+    try:
+        return int(total)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fetch_in_order(fetch, args, max_workers):
+    """Yield fetch(arg) for each arg, keeping up to max_workers requests in flight.
+
+    Results come back in the order of args; only a bounded window of
+    pages is buffered, however slow the caller is.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = collections.deque()
+        try:
+            for arg in args:
+                pending.append(executor.submit(fetch, arg))
+                if len(pending) >= max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _fetch_until_short(fetch, args, max_workers, records_path, page_size):
+    """Yield fetch(arg) in order until a page has fewer than page_size records.
+
+    For when the total is unknown: up to max_workers pages are requested
+    ahead, so a few requests past the last page may be made and dropped.
+    """
+    responses = _fetch_in_order(fetch, args, max_workers)
+    try:
+        for data in responses:
+            yield data
+            if _count_records(data, records_path) < page_size:
+                return
+    finally:
+        responses.close()
+
+
 def paginate_none(client, url, params, stream_config):
     """Single request, no pagination."""
     data = client.request_json(url, params=params)
@@ -53,16 +129,27 @@ def paginate_page(client, url, params, stream_config):
         pagination_page_size    - Records per page (default: 100)
         pagination_start_page   - Starting page number (default: 1)
         pagination_total_path   - JSONPath to total count in response (optional)
+        pagination_max_concurrency - Pages requested in parallel once the
+                                  total is known (default: 4)
+        pagination_speculative  - Without a total, request pages ahead in
+                                  parallel and stop at the first short page
+                                  (default: false)
     """
     page_param = stream_config.get("pagination_page_param", "page")
     size_param = stream_config.get("pagination_size_param", "per_page")
     page_size = stream_config.get("pagination_page_size", 100)
     page = stream_config.get("pagination_start_page", 1)
+    records_path = stream_config.get("records_path")
     total_path = stream_config.get("pagination_total_path")
+    max_concurrency = int(
+        stream_config.get("pagination_max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    )
+    speculative = stream_config.get("pagination_speculative", False)
 
     params = dict(params) if params else {}
     params[size_param] = page_size
     pages_fetched = 0
+    request_json = client.request_json
 
     while True:
         pages_fetched += 1
@@ -71,36 +158,43 @@ def paginate_page(client, url, params, stream_config):
             break
 
         params[page_param] = page
-        data = client.request_json(url, params=params)
+        data = request_json(url, params=params)
         yield data
 
-        # Determine if there are more pages
-        records_path = stream_config.get("records_path")
-        if records_path:
-            records = _extract_jsonpath(data, records_path) or []
-        elif isinstance(data, list):
-            records = data
-        elif isinstance(data, dict):
-            # Try common keys
-            for key in ("data", "results", "items", "records", "value", "entries"):
-                if key in data and isinstance(data[key], list):
-                    records = data[key]
-                    break
-            else:
-                records = []
-        else:
-            records = []
-
         # Check if we've received fewer than page_size records
-        if len(records) < page_size:
+        if _count_records(data, records_path) < page_size:
             break
 
         # Check total count if available
         if total_path:
-            total = _extract_jsonpath(data, total_path)
+            total = _extract_total(data, total_path)
             if total and page * page_size >= total:
                 break
 
+            # With the total known, the remaining pages are independent
+            if total and max_concurrency > 1:
+                last_page = math.ceil(total / page_size)
+                pages = range(page + 1, last_page + 1)[:MAX_PAGES - pages_fetched]
+
+                def fetch(page_number):
+                    return request_json(
+                        url, params={**params, page_param: page_number}
+                    )
+
+                yield from _fetch_in_order(fetch, pages, max_concurrency)
+                break
+
+        if speculative and max_concurrency > 1:
+            pages = range(page + 1, page + 1 + MAX_PAGES - pages_fetched)
+
+            def fetch(page_number):
+                return request_json(url, params={**params, page_param: page_number})
+
+            yield from _fetch_until_short(
+                fetch, pages, max_concurrency, records_path, page_size
+            )
+            break
+
         page += 1
 
 
@@ -111,15 +205,28 @@ def paginate_offset(client, url, params, stream_config):
         pagination_offset_param - Query param for offset (default: "offset")
         pagination_limit_param  - Query param for limit (default: "limit")
         pagination_page_size    - Records per page (default: 100)
+        pagination_total_path   - JSONPath to total count in response (optional)
+        pagination_max_concurrency - Pages requested in parallel once the
+                                  total is known (default: 4)
+        pagination_speculative  - Without a total, request pages ahead in
+                                  parallel and stop at the first short page
+                                  (default: false)
     """
     offset_param = stream_config.get("pagination_offset_param", "offset")
     limit_param = stream_config.get("pagination_limit_param", "limit")
     page_size = stream_config.get("pagination_page_size", 100)
+    records_path = stream_config.get("records_path")
+    total_path = stream_config.get("pagination_total_path")
+    max_concurrency = int(
+        stream_config.get("pagination_max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    )
+    speculative = stream_config.get("pagination_speculative", False)
 
     params = dict(params) if params else {}
     params[limit_param] = page_size
     offset = 0
     pages_fetched = 0
+    request_json = client.request_json
 
     while True:
         pages_fetched += 1
@@ -128,29 +235,41 @@ def paginate_offset(client, url, params, stream_config):
             break
 
         params[offset_param] = offset
-        data = client.request_json(url, params=params)
+        data = request_json(url, params=params)
         yield data
 
-        records_path = stream_config.get("records_path")
-        if records_path:
-            records = _extract_jsonpath(data, records_path) or []
-        elif isinstance(data, list):
-            records = data
-        elif isinstance(data, dict):
-            for key in ("data", "results", "items", "records", "value", "entries"):
-                if key in data and isinstance(data[key], list):
-                    records = data[key]
-                    break
-            else:
-                records = []
-        else:
-            records = []
-
-        if len(records) < page_size:
+        if _count_records(data, records_path) < page_size:
             break
 
         offset += page_size
 
+        # With the total known, the remaining windows are independent
+        if total_path and max_concurrency > 1:
+            total = _extract_total(data, total_path)
+            if total is not None:
+                offsets = range(offset, total, page_size)[:MAX_PAGES - pages_fetched]
+
+                def fetch(page_offset):
+                    return request_json(
+                        url, params={**params, offset_param: page_offset}
+                    )
+
+                yield from _fetch_in_order(fetch, offsets, max_concurrency)
+                break
+
+        if speculative and max_concurrency > 1:
+            offsets = range(
+                offset, offset + (MAX_PAGES - pages_fetched) * page_size, page_size
+            )
+
+            def fetch(page_offset):
+                return request_json(url, params={**params, offset_param: page_offset})
+
+            yield from _fetch_until_short(
+                fetch, offsets, max_concurrency, records_path, page_size
+            )
+            break
+
 
 def paginate_cursor(client, url, params, stream_config):
     """Cursor/token based pagination.
@@ -167,6 +286,7 @@ def paginate_cursor(client, url, params, stream_config):
 
     params = dict(params) if params else {}
     pages_fetched = 0
+    request_json = client.request_json
 
     while True:
         pages_fetched += 1
@@ -174,7 +294,7 @@ def paginate_cursor(client, url, params, stream_config):
             LOGGER.warning("cursor: Reached max page limit (%d). Stopping.", MAX_PAGES)
             break
 
-        data = client.request_json(url, params=params)
+        data = request_json(url, params=params)
         yield data
 
         next_cursor = _extract_jsonpath(data, cursor_path)
@@ -190,6 +310,7 @@ def paginate_link_header(client, url, params, stream_config):
     Follows the 'next' link in the response headers.
     """
     pages_fetched = 0
+    request_raw = client.request_raw
 
     while True:
         pages_fetched += 1
@@ -197,7 +318,7 @@ def paginate_link_header(client, url, params, stream_config):
             LOGGER.warning("link_header: Reached max page limit (%d). Stopping.", MAX_PAGES)
             break
 
-        resp = client.request_raw(url, params=params)
+        resp = request_raw(url, params=params)
         data = resp.json()
         yield data
 
@@ -229,6 +350,7 @@ def paginate_jsonpath(client, url, params, stream_config):
 
     params = dict(params) if params else {}
     pages_fetched = 0
+    request_json = client.request_json
 
     while True:
         pages_fetched += 1
@@ -236,7 +358,7 @@ def paginate_jsonpath(client, url, params, stream_config):
             LOGGER.warning("jsonpath: Reached max page limit (%d). Stopping.", MAX_PAGES)
             break
 
-        data = client.request_json(url, params=params)
+        data = request_json(url, params=params)
         yield data
 
         next_value = _extract_jsonpath(data, next_path)
@@ -256,6 +378,7 @@ def paginate_odata(client, url, params, stream_config):
     Follows the @odata.nextLink URL in the response body.
     """
     pages_fetched = 0
+    request_json = client.request_json
 
     while True:
         pages_fetched += 1
@@ -263,7 +386,7 @@ def paginate_odata(client, url, params, stream_config):
             LOGGER.warning("odata: Reached max page limit (%d). Stopping.", MAX_PAGES)
             break
 
-        data = client.request_json(url, params=params)
+        data = request_json(url, params=params)
         yield data
 
         next_link = data.get("@odata.nextLink")
@@ -274,8 +397,28 @@ def paginate_odata(client, url, params, stream_config):
         params = None  # nextLink contains all params
 
 
-# Paginator registry
-PAGINATORS = {
+def _prefetching(pages):
+    """Yield from a page generator while fetching the next page in the background.
+
+    Pages are still requested one at a time and in order; the worker
+    just starts on page N+1 as soon as page N is handed to the caller.
+    Errors raised by the paginator surface when the caller reaches them.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(next, pages, _DONE)
+            while True:
+                page = future.result()
+                if page is _DONE:
+                    return
+                future = executor.submit(next, pages, _DONE)
+                yield page
+    finally:
+        pages.close()
+
+
+# Paginator registry (read-only)
+PAGINATORS = types.MappingProxyType({
     "none": paginate_none,
     "page": paginate_page,
     "offset": paginate_offset,
@@ -283,21 +426,34 @@ PAGINATORS = {
     "link_header": paginate_link_header,
     "jsonpath": paginate_jsonpath,
     "odata": paginate_odata,
-}
+})
+
+_SUPPORTED_STYLES = ", ".join(PAGINATORS)
 
 
+@functools.lru_cache(maxsize=None)
 def get_paginator(style):
     """Get a paginator function by name.
 
+    Cached, so each style's prefetching wrapper is built only once.
+
     Args:
         style: Pagination style name.
 
     Returns:
         A generator function(client, url, params, stream_config).
     """
-    if style not in PAGINATORS:
+    paginator = PAGINATORS.get(style)
+    if paginator is None:
         raise ValueError(
             f"Unknown pagination_style: '{style}'. "
-            f"Supported: {', '.join(PAGINATORS.keys())}"
+            f"Supported: {_SUPPORTED_STYLES}"
         )
-    return PAGINATORS[style]
+    if paginator is paginate_none:
+        return paginator  # a single request; nothing to prefetch
+
+    @functools.wraps(paginator)
+    def prefetching_paginator(client, url, params, stream_config):
+        return _prefetching(paginator(client, url, params, stream_config))
+
+    return prefetching_paginator
@@ -11,6 +11,7 @@ API responses come in many shapes:
   - Envelope: {"status": "ok", "items": [...], "total": 100}
 """
 
+import functools
 import logging
 
 from jsonpath_ng import parse as jsonpath_parse
@@ -35,6 +36,39 @@ COMMON_RECORD_KEYS = [
     "payload",
 ]
 
+_COMMON_KEYS_SET = frozenset(COMMON_RECORD_KEYS)
+_COMMON_KEYS_ORDER = {key: index for index, key in enumerate(COMMON_RECORD_KEYS)}
+
+
+def _common_keys_in(data):
+    """The COMMON_RECORD_KEYS present in data, in priority order."""
+    return sorted(data.keys() & _COMMON_KEYS_SET, key=_COMMON_KEYS_ORDER.__getitem__)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_jsonpath(expression):
+    """Parse a JSONPath expression, caching the result.
+
+    Taps only ever use a handful of distinct expressions, and parsing
+    one costs far more than evaluating it against a page.
+    """
+    return jsonpath_parse(expression)
+
+
+def compile_records_path(records_path):
+    """Parse a records_path JSONPath once so it can be reused for every page.
+
+    Returns None if no path is set. An invalid expression is returned
+    unparsed; extract_records then logs the error per page as before.
+    """
+    if not records_path:
+        return None
+    try:
+        return compile_jsonpath(records_path)
+    except Exception as e:
+        LOGGER.error("Invalid records_path JSONPath '%s': %s", records_path, e)
+        return records_path
+
 
 def extract_records(response_data, records_path=None):
     """Extract record list from an API response.
@@ -42,54 +76,65 @@ def extract_records(response_data, records_path=None):
     Args:
         response_data: The parsed JSON response (dict or list).
         records_path: Optional JSONPath expression to locate records
-                      (e.g., "$.data[*]", "$.results", "$.response.items").
+                      (e.g., "$.data[*]", "$.results", "$.response.items"),
+                      as a string or as returned by compile_records_path.
 
     Returns:
         A list of record dicts.
     """
+    return list(iter_records(response_data, records_path))
+
+
+def iter_records(response_data, records_path=None):
+    """Iterate over the records in an API response.
+
+    Same arguments and records as extract_records, but yielded one at a
+    time for callers that only loop over them once.
+    """
     if response_data is None:
-        return []
+        return iter(())
 
-    # If the response is already a list, return it directly
+    # If the response is already a list, use it directly
     if isinstance(response_data, list):
-        return [r for r in response_data if isinstance(r, dict)]
+        return (r for r in response_data if isinstance(r, dict))
 
     # If a JSONPath is specified, use it
     if records_path:
-        return _extract_jsonpath(response_data, records_path)
+        return _iter_jsonpath(response_data, records_path)
 
     # Auto-detect: look for common wrapper keys
     if isinstance(response_data, dict):
-        return _auto_detect_records(response_data)
+        return iter(_auto_detect_records(response_data))
 
-    return []
+    return iter(())
 
 
-def _extract_jsonpath(data, expression):
-    """Extract records using a JSONPath expression.
+def _iter_jsonpath(data, expression):
+    """Yield records matched by a JSONPath expression.
 
     Supports both "$.data[*]" style (returns individual items)
     and "$.data" style (returns the array itself).
     """
     try:
-        matches = jsonpath_parse(expression).find(data)
-        if not matches:
-            LOGGER.warning("JSONPath '%s' matched nothing in response", expression)
-            return []
-
-        results = []
-        for match in matches:
-            value = match.value
-            if isinstance(value, list):
-                results.extend([r for r in value if isinstance(r, dict)])
-            elif isinstance(value, dict):
-                results.append(value)
-
-        return results
-
+        if isinstance(expression, str):
+            expression = compile_jsonpath(expression)
+        matches = expression.find(data)
     except Exception as e:
         LOGGER.error("JSONPath extraction failed for '%s': %s", expression, e)
-        return []
+        return
+
+    if not matches:
+        LOGGER.warning("JSONPath '%s' matched nothing in response", expression)
+        return
+
+    for match in matches:
+        value = match.value
+        if isinstance(value, list):
+            for record in value:
+                if isinstance(record, dict):
+                    yield record
+        elif isinstance(value, dict):
+            yield value
 
 
 def _auto_detect_records(data):
@@ -98,31 +143,31 @@ def _auto_detect_records(data):
     Tries common wrapper keys, then falls back to the largest
     list value in the dict.
     """
-    # Try common keys
-    for key in COMMON_RECORD_KEYS:
-        if key in data:
-            value = data[key]
-            if isinstance(value, list):
-                records = [r for r in value if isinstance(r, dict)]
-                if records:
-                    LOGGER.debug("Auto-detected records at key '%s' (%d records)",
-                                 key, len(records))
-                    return records
-            elif isinstance(value, dict):
-                # Try one level deeper (e.g., {"response": {"items": [...]}})
-                for sub_key in COMMON_RECORD_KEYS:
-                    if sub_key in value and isinstance(value[sub_key], list):
-                        records = [r for r in value[sub_key] if isinstance(r, dict)]
-                        if records:
-                            LOGGER.debug("Auto-detected records at '%s.%s' (%d records)",
-                                         key, sub_key, len(records))
-                            return records
+    # Try common keys (only those present, in priority order)
+    for key in _common_keys_in(data):
+        value = data[key]
+        if isinstance(value, list):
+            records = [r for r in value if isinstance(r, dict)]
+            if records:
+                LOGGER.debug("Auto-detected records at key '%s' (%d records)",
+                             key, len(records))
+                return records
+        elif isinstance(value, dict):
+            # Try one level deeper (e.g., {"response": {"items": [...]}})
+            for sub_key in _common_keys_in(value):
+                if isinstance(value[sub_key], list):
+                    records = [r for r in value[sub_key] if isinstance(r, dict)]
+                    if records:
+                        LOGGER.debug("Auto-detected records at '%s.%s' (%d records)",
+                                     key, sub_key, len(records))
+                        return records
 
     # Fallback: find the largest list of dicts in the response
     best_key = None
     best_count = 0
     for key, value in data.items():
-        if isinstance(value, list):
+        # A list no longer than the best so far can't beat it
+        if isinstance(value, list) and len(value) > best_count:
             dict_count = sum(1 for item in value if isinstance(item, dict))
             if dict_count > best_count:
                 best_count = dict_count
@@ -22,7 +22,14 @@ setup(
             "pytest",
             "pylint",
             "responses",
-        ]
+        ],
+        "fast": [
+            "orjson==3.10.7",
+            "msgspec==0.18.6",
+        ],
+        "http2": [
+            "httpx[http2]==0.27.2",
+        ],
     },
     entry_points={
         "console_scripts": [
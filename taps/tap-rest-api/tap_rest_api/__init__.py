@@ -21,9 +21,6 @@ import sys
 import singer
 from singer import utils
 
-from tap_rest_api.discover import discover
-from tap_rest_api.sync import sync
-
 REQUIRED_CONFIG_KEYS = [
     "api_url",
     "streams",
@@ -37,15 +34,22 @@ def main():
     """Entry point for tap-rest-api."""
     args = utils.parse_args(REQUIRED_CONFIG_KEYS)
 
+    # Mode-specific modules are imported on demand to keep startup light
     if args.discover:
+        from tap_rest_api.discover import discover
+
         catalog = discover(args.config)
         json.dump(catalog.to_dict(), sys.stdout, indent=2)
         LOGGER.info("Discovery complete.")
     else:
+        from tap_rest_api.sync import sync
+
         state = args.state or {}
         if args.catalog:
             catalog = args.catalog
         else:
+            from tap_rest_api.discover import discover
+
             catalog = discover(args.config)
 
         sync(args.config, state, catalog)
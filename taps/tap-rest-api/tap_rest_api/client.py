@@ -6,35 +6,96 @@ Handles:
   - Retry with exponential backoff (429, 5xx, connection errors)
   - Configurable request timeout
   - Raw and paginated request methods
+  - Optional HTTP/2 transport (httpx) so concurrent requests share one
+    multiplexed connection
 """
 
+import datetime
+import functools
+import json
 import math
-import time
+import random
+from collections import ChainMap
 from email.utils import parsedate_to_datetime
 
 import backoff
 import requests
 import singer
+from requests.adapters import HTTPAdapter
 
 from tap_rest_api.auth import build_auth, OAuth2Auth, AuthError
 
+try:
+    # Optional C JSON encoder for request bodies (pip install tap-rest-api[fast])
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional C JSON parser for responses (pip install tap-rest-api[fast]).
+    # Not orjson.loads: it turns integers beyond 64 bits into floats
+    import msgspec
+except ImportError:
+    msgspec = None
+
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
 LOGGER = singer.get_logger()
 
+# Upper bound (seconds) of the random delay added on top of Retry-After
+RETRY_AFTER_JITTER = 1.0
+
+# Connection pool sizing: paginated syncs hit one host many times, so keep
+# enough keep-alive connections per host to avoid reconnects and TLS
+# handshakes. Override with config keys pool_maxsize / pool_block.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+
+def _pool_maxsize(config):
+    """Keep-alive connections to keep per host.
+
+    Uses config pool_maxsize if set; otherwise a default large enough for
+    the most concurrent stream's page requests.
+    """
+    if "pool_maxsize" in config:
+        return int(config["pool_maxsize"])
+    concurrency = [
+        int(stream.get("pagination_max_concurrency", 0))
+        for stream in config.get("streams", [])
+    ]
+    return max([POOL_MAXSIZE, *concurrency])
+
 
-def _parse_retry_after(retry_after_value, default=60):
-    """Parse Retry-After header value (seconds or HTTP-date format)."""
+@functools.lru_cache(maxsize=128)
+def _parse_retry_after_seconds(retry_after_str):
+    """Parse a numeric Retry-After value, or return None.
+
+    Cached: servers send the same handful of values ("1", "60", ...).
+    """
+    try:
+        return max(1, math.floor(float(retry_after_str)))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def _parse_retry_after(retry_after_value, default=None):
+    """Parse Retry-After header value (seconds or HTTP-date format).
+
+    Returns default (None) when the header is absent or unparseable, so
+    the caller falls back to exponential backoff.
+    """
     if not retry_after_value:
         return default
 
     retry_after_str = str(retry_after_value).strip()
 
-    try:
-        return max(1, math.floor(float(retry_after_str)))
-    except (ValueError, TypeError):
-        pass
+    seconds = _parse_retry_after_seconds(retry_after_str)
+    if seconds is not None:
+        return seconds
 
+    # HTTP-date format (not cached: the value changes every time)
     try:
-        import datetime
         target_time = parsedate_to_datetime(retry_after_str)
         wait = (target_time - datetime.datetime.now(
             tz=target_time.tzinfo
@@ -43,8 +104,8 @@ def _parse_retry_after(retry_after_value, default=60):
     except (ValueError, TypeError, OverflowError):
         pass
 
-    LOGGER.warning("Could not parse Retry-After value '%s', using default %ds",
-                   retry_after_str, default)
+    LOGGER.warning("Could not parse Retry-After value '%s', ignoring it",
+                   retry_after_str)
     return default
 
 
@@ -53,7 +114,14 @@ class RestApiError(Exception):
 
 
 class RateLimitError(RestApiError):
-    """HTTP 429 - Too Many Requests."""
+    """HTTP 429 - Too Many Requests.
+
+    retry_after holds the server's Retry-After hint in seconds, if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class ServerError(RestApiError):
@@ -64,6 +132,42 @@ class ClientError(RestApiError):
     """HTTP 4xx client-side error (non-auth, non-rate-limit)."""
 
 
+@functools.lru_cache(maxsize=256)
+def _resolve_url(base_url_prefix, path):
+    """Join a relative request path onto the base URL.
+
+    Cached: a tap only ever requests a handful of distinct paths.
+    """
+    return base_url_prefix + path.lstrip("/")
+
+
+def _json_bytes(obj):
+    """Encode a request body as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _rate_limit_wait(factor=2):
+    """Wait generator for RateLimitError.
+
+    Honors the server's Retry-After (plus a little jitter so concurrent
+    taps don't retry in lockstep); otherwise falls back to exponential
+    backoff with full jitter.
+    """
+    expo = backoff.expo(factor=factor)
+    next(expo)
+    exc = yield
+    while True:
+        delay = next(expo)
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is None:
+            wait = backoff.full_jitter(delay)
+        else:
+            wait = retry_after + random.uniform(0, RETRY_AFTER_JITTER)
+        exc = yield wait
+
+
 def _log_backoff(details):
     LOGGER.warning(
         "Backing off %.1f seconds after %d tries calling %s",
@@ -73,12 +177,85 @@ def _log_backoff(details):
     )
 
 
+class _Http2Session:
+    """requests.Session-like wrapper around an HTTP/2 httpx.Client.
+
+    Covers the parts of the Session API that RestClient and the auth
+    handlers use. httpx errors are re-raised as their requests
+    equivalents so the backoff decorators still apply.
+    """
+
+    __slots__ = ("_httpx", "_client", "hooks")
+
+    def __init__(self, pool_maxsize):
+        try:
+            import httpx
+        except ImportError:
+            LOGGER.error(
+                "httpx is required for HTTP/2. "
+                "Install with: pip install 'tap-rest-api[http2]'"
+            )
+            raise
+
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize,
+            ),
+        )
+        self.hooks = {"response": []}
+
+    @property
+    def headers(self):
+        return self._client.headers
+
+    @property
+    def auth(self):
+        return self._client.auth
+
+    @auth.setter
+    def auth(self, value):
+        # requests' HTTPBasicAuth is a callable httpx accepts as-is
+        self._client.auth = value
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self._send("GET", url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, params=None, data=None, headers=None, timeout=None):
+        return self._send(
+            "POST", url, params=params, content=data, headers=headers, timeout=timeout
+        )
+
+    def _send(self, method, url, **kwargs):
+        try:
+            resp = self._client.request(method, url, **kwargs)
+        except self._httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except self._httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        for hook in self.hooks["response"]:
+            hook(resp)
+        return resp
+
+    def close(self):
+        self._client.close()
+
+
 class RestClient:
     """Generic REST API client with auth, retries, and pagination support."""
 
-    def __init__(self, config):
+    __slots__ = (
+        "config", "base_url", "_base_url_prefix", "timeout", "user_agent",
+        "global_headers", "http_method", "_post_body", "_session", "auth",
+        "global_params",
+    )
+
+    def __init__(self, config, http2=False):
         self.config = config
         self.base_url = config["api_url"].rstrip("/")
+        self._base_url_prefix = self.base_url + "/"
         self.timeout = config.get("request_timeout", 300)
         self.user_agent = config.get("user_agent", "tap-rest-api/1.0")
 
@@ -88,8 +265,29 @@ class RestClient:
         # HTTP method (default GET)
         self.http_method = config.get("http_method", "GET").upper()
 
+        # JSON body for POST requests, encoded once. Without it, POST
+        # requests send their params as the JSON body instead of the query.
+        body = config.get("body")
+        self._post_body = _json_bytes(body) if body is not None else None
+
         # Build session
-        self._session = requests.Session()
+        # Every request, including concurrent page fetches, shares this
+        # session's pool
+        pool_maxsize = _pool_maxsize(config)
+        if http2:
+            self._session = _Http2Session(pool_maxsize)
+        else:
+            self._session = requests.Session()
+            # Retries are handled by the backoff decorators on request()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize,
+                pool_block=bool(config.get("pool_block", False)),
+                max_retries=0,
+            )
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._session.headers["Connection"] = "keep-alive"
         self._session.headers.update({
             "Accept": "application/json",
             "User-Agent": self.user_agent,
@@ -112,19 +310,21 @@ class RestClient:
         ServerError,
         max_tries=5,
         on_backoff=_log_backoff,
+        jitter=backoff.full_jitter,
     )
     @backoff.on_exception(
-        backoff.expo,
+        _rate_limit_wait,
         RateLimitError,
         max_tries=7,
         on_backoff=_log_backoff,
-        factor=2,
+        jitter=None,  # applied by _rate_limit_wait
     )
     @backoff.on_exception(
         backoff.expo,
         (requests.ConnectionError, requests.Timeout),
         max_tries=5,
         on_backoff=_log_backoff,
+        jitter=backoff.full_jitter,
     )
     def request(self, url, params=None, headers=None, method=None):
         """Execute an HTTP request with retry logic.
@@ -132,7 +332,8 @@ class RestClient:
         Args:
             url: Full URL or path (relative to base_url).
             params: Query parameters dict.
-            headers: Per-request headers (merged with session headers).
+            headers: Per-request headers (requests merges these over the
+                session headers).
             method: HTTP method override (default: self.http_method).
 
         Returns:
@@ -145,77 +346,92 @@ class RestClient:
             AuthError: On 401 after token refresh attempt.
         """
         # Build full URL if a relative path was given
-        if not url.startswith("http"):
-            url = f"{self.base_url}/{url.lstrip('/')}"
-
-        # Merge global params with per-request params
-        merged_params = dict(self.global_params)
-        if params:
-            merged_params.update(params)
+        if url[:4] != "http":
+            url = _resolve_url(self._base_url_prefix, url)
 
-        # Apply auth (may add headers or params)
-        merged_params = self.auth.apply(self._session, merged_params)
-
-        # Per-request headers
-        req_headers = dict(self._session.headers)
-        if headers:
-            req_headers.update(headers)
+        # Layer per-request params over the global params without copying
+        # the globals; writes (e.g. an API key param) land in the first map
+        merged_params = ChainMap(dict(params) if params else {}, self.global_params)
 
         method = method or self.http_method
+        resp = self._do_request(method, url, merged_params, headers)
 
-        LOGGER.debug("REQUEST: %s %s params=%s", method, url, merged_params)
-
-        if method == "POST":
-            resp = self._session.post(
-                url, json=merged_params, headers=req_headers, timeout=self.timeout
-            )
-        else:
-            resp = self._session.get(
-                url, params=merged_params, headers=req_headers, timeout=self.timeout
-            )
+        # Handle response status codes; success is by far the common case
+        status_class = resp.status_code // 100
+        if status_class < 4:
+            return resp
 
-        # Handle response status codes
         if resp.status_code == 429:
-            wait = _parse_retry_after(resp.headers.get("Retry-After"))
-            LOGGER.warning("Rate limited (429). Waiting %s seconds", wait)
-            time.sleep(wait)
-            raise RateLimitError(f"429: {resp.text[:500]}")
+            retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+            if retry_after is None:
+                LOGGER.warning("Rate limited (429), no Retry-After. Backing off.")
+            else:
+                LOGGER.warning("Rate limited (429). Retry-After: %s seconds", retry_after)
+            raise RateLimitError(f"429: {resp.text[:500]}", retry_after=retry_after)
 
         if resp.status_code == 401:
             # Try token refresh for OAuth2
             if isinstance(self.auth, OAuth2Auth):
                 LOGGER.warning("Got 401, attempting OAuth2 token refresh...")
-                self.auth.force_refresh()
-                self.auth.apply(self._session, merged_params)
+                # Discard only the token this request was sent with; another
+                # thread may already have replaced it
+                sent_auth = resp.request.headers.get("Authorization", "")
+                self.auth.force_refresh(sent_auth.partition(" ")[2] or None)
                 # Retry with the ORIGINAL method (not hardcoded GET)
-                if method == "POST":
-                    resp = self._session.post(
-                        url, json=merged_params, headers=req_headers, timeout=self.timeout
-                    )
-                else:
-                    resp = self._session.get(
-                        url, params=merged_params, headers=req_headers, timeout=self.timeout
-                    )
+                resp = self._do_request(method, url, merged_params, headers)
                 if resp.status_code == 401:
                     raise AuthError(f"Authentication failed after refresh: {resp.text[:500]}")
+                status_class = resp.status_code // 100
+                if status_class < 4:
+                    return resp
             else:
                 raise AuthError(f"Authentication failed (401): {resp.text[:500]}")
 
-        if 500 <= resp.status_code < 600:
+        if status_class == 5:
             raise ServerError(
                 f"Server error {resp.status_code}: {resp.text[:500]}"
             )
 
-        if 400 <= resp.status_code < 500:
+        if status_class == 4:
             raise ClientError(
                 f"Client error {resp.status_code}: {resp.text[:500]}"
             )
 
         return resp
 
+    def _do_request(self, method, url, params, headers):
+        """Apply auth and send a single request; no status handling."""
+        # Apply auth (may add headers or params)
+        params = self.auth.apply(self._session, params)
+
+        LOGGER.debug("REQUEST: %s %s params=%s", method, url, params)
+
+        if method == "POST":
+            return self._post(url, params, headers)
+        return self._session.get(
+            url, params=params, headers=headers, timeout=self.timeout
+        )
+
+    def _post(self, url, params, headers):
+        """Send a POST with a JSON body (see the "body" config key)."""
+        if self._post_body is None:
+            # No configured body: the params are the body
+            data, params = _json_bytes(dict(params)), None
+        else:
+            data = self._post_body
+        headers = {**JSON_CONTENT_TYPE, **headers} if headers else JSON_CONTENT_TYPE
+        return self._session.post(
+            url, params=params, data=data, headers=headers, timeout=self.timeout
+        )
+
     def request_json(self, url, params=None, headers=None, method=None):
         """Execute request and return parsed JSON."""
         resp = self.request(url, params=params, headers=headers, method=method)
+        if msgspec is not None:
+            try:
+                return msgspec.json.decode(resp.content)
+            except (msgspec.DecodeError, ValueError):
+                pass  # e.g. NaN or a non-UTF-8 body; let requests handle it
         try:
             return resp.json()
         except ValueError:
@@ -228,3 +444,7 @@ class RestClient:
     def request_raw(self, url, params=None, headers=None, method=None):
         """Execute request and return the raw Response object (for pagination)."""
         return self.request(url, params=params, headers=headers, method=method)
+
+    def close(self):
+        """Close the underlying session and its pooled connections."""
+        self._session.close()
@@ -13,6 +13,10 @@ of inference.
 
 import json
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
 
 import singer
 from singer.catalog import Catalog, CatalogEntry
@@ -20,7 +24,7 @@ from singer import metadata
 
 from tap_rest_api.client import RestClient
 from tap_rest_api.pagination import get_paginator
-from tap_rest_api.record_extractor import extract_records
+from tap_rest_api.record_extractor import compile_records_path, extract_records
 from tap_rest_api.schema_inference import (
     infer_schema_from_records,
     build_flat_schema,
@@ -28,6 +32,12 @@ from tap_rest_api.schema_inference import (
 
 LOGGER = singer.get_logger()
 
+# Streams sampled in parallel during discovery (config: discover_concurrency)
+DEFAULT_DISCOVER_CONCURRENCY = 8
+
+# Concurrent sample page requests per page/offset-paginated stream
+MAX_SAMPLE_PAGE_WORKERS = 8
+
 
 def _build_stream_url(config, stream_config):
     """Build the full URL for a stream endpoint."""
@@ -38,38 +48,151 @@ def _build_stream_url(config, stream_config):
     return f"{base_url}/{path.lstrip('/')}" if path else base_url
 
 
+@dataclass(frozen=True)
+class StreamRequest:
+    """Request shape of a stream, computed once and reused for every page."""
+
+    url: str
+    base_params: tuple
+    records_path: Any  # compiled JSONPath, or None
+
+    def params(self):
+        """A fresh, mutable copy of the stream's query params."""
+        return dict(self.base_params)
+
+
+def prepare_stream_request(config, stream_config, params=None):
+    """Build the StreamRequest for a stream.
+
+    params defaults to the stream's configured params.
+    """
+    if params is None:
+        params = stream_config.get("params", {})
+    return StreamRequest(
+        url=_build_stream_url(config, stream_config),
+        base_params=tuple(params.items()),
+        records_path=compile_records_path(stream_config.get("records_path")),
+    )
+
+
+def _sample_page_params(params, stream_config, page_size, index):
+    """Query params for the index-th (0-based) page of a page/offset stream."""
+    page_params = dict(params)
+    if stream_config.get("pagination_style") == "page":
+        page_param = stream_config.get("pagination_page_param", "page")
+        size_param = stream_config.get("pagination_size_param", "per_page")
+        start_page = stream_config.get("pagination_start_page", 1)
+        page_params[size_param] = page_size
+        page_params[page_param] = start_page + index
+    else:
+        offset_param = stream_config.get("pagination_offset_param", "offset")
+        limit_param = stream_config.get("pagination_limit_param", "limit")
+        page_params[limit_param] = page_size
+        page_params[offset_param] = index * page_size
+    return page_params
+
+
+def _fetch_sample_pages(client, url, params, stream_config, records_path,
+                        page_size, max_sample):
+    """Fetch sample records from a page- or offset-paginated endpoint.
+
+    Page URLs don't depend on earlier responses, so once the first page
+    comes back full the remaining sample pages are requested in parallel.
+    """
+    first_page = client.request_json(
+        url, params=_sample_page_params(params, stream_config, page_size, 0)
+    )
+    records = extract_records(first_page, records_path)
+    num_pages = math.ceil(max_sample / page_size)
+    if len(records) < page_size or num_pages <= 1:
+        return records
+
+    def fetch(index):
+        return client.request_json(
+            url, params=_sample_page_params(params, stream_config, page_size, index)
+        )
+
+    with ThreadPoolExecutor(max_workers=min(num_pages - 1, MAX_SAMPLE_PAGE_WORKERS)) as executor:
+        futures = [executor.submit(fetch, index) for index in range(1, num_pages)]
+        try:
+            # Keep page order; stop at the first short (last) page
+            for future in futures:
+                page_records = extract_records(future.result(), records_path)
+                records.extend(page_records)
+                if len(page_records) < page_size:
+                    break
+        except Exception as e:
+            # Speculative pages past the end may error on some APIs
+            LOGGER.debug("Stopped sampling '%s' early: %s", stream_config["name"], e)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    return records
+
+
 def _fetch_sample_records(client, config, stream_config, max_sample=200):
     """Fetch sample records from an API endpoint for schema inference.
 
     Fetches up to max_sample records (possibly across multiple pages).
     """
-    url = _build_stream_url(config, stream_config)
-    params = dict(stream_config.get("params", {}))
-    records_path = stream_config.get("records_path")
+    request = prepare_stream_request(config, stream_config)
+    url = request.url
+    params = request.params()
+    records_path = request.records_path
     pagination_style = stream_config.get("pagination_style", "none")
 
-    # For discovery, we only need a small sample
-    # Override page size to be small
-    sample_params = dict(params)
-    page_size_param = stream_config.get("pagination_size_param", "per_page")
-    sample_page_size = min(stream_config.get("pagination_page_size", 100), max_sample)
     if pagination_style in ("page", "offset"):
-        sample_params[page_size_param] = sample_page_size
-
-    paginator = get_paginator(pagination_style)
-    records = []
-
-    for page_data in paginator(client, url, sample_params, stream_config):
-        page_records = extract_records(page_data, records_path)
-        records.extend(page_records)
-        if len(records) >= max_sample:
-            break
+        # For discovery, we only need a small sample
+        # Override page size to be small
+        sample_page_size = min(stream_config.get("pagination_page_size", 100), max_sample)
+        records = _fetch_sample_pages(
+            client, url, params, stream_config, records_path, sample_page_size, max_sample
+        )
+    else:
+        # Other styles follow a cursor/link from the previous page, so
+        # their requests are inherently sequential
+        paginator = get_paginator(pagination_style)
+        records = []
+
+        for page_data in paginator(client, url, params, stream_config):
+            page_records = extract_records(page_data, records_path)
+            records.extend(page_records)
+            if len(records) >= max_sample:
+                break
 
     LOGGER.info("Fetched %d sample records for stream '%s'",
                 len(records), stream_config["name"])
     return records[:max_sample]
 
 
+def _get_raw_schema(client, config, stream_config):
+    """Return the static schema for a stream, or infer one from sample records."""
+    stream_name = stream_config["name"]
+    LOGGER.info("Discovering stream: %s", stream_name)
+
+    # Use static schema if provided, otherwise infer
+    if "schema" in stream_config:
+        LOGGER.info("Using static schema for '%s'", stream_name)
+        return stream_config["schema"]
+
+    # Fetch sample records and infer schema
+    try:
+        sample_records = _fetch_sample_records(client, config, stream_config)
+        if not sample_records:
+            LOGGER.warning(
+                "No sample records for '%s', creating empty schema", stream_name
+            )
+            return {"type": ["null", "object"], "properties": {}}
+        return infer_schema_from_records(
+            sample_records,
+            stability_window=stream_config.get("schema_stability_window"),
+        )
+    except Exception as e:
+        LOGGER.error("Failed to discover stream '%s': %s", stream_name, e)
+        return {"type": ["null", "object"], "properties": {}}
+
+
 def _build_catalog_entry(stream_name, flat_schema, key_properties,
                           replication_key, replication_method):
     """Build a CatalogEntry with proper metadata."""
@@ -139,11 +262,27 @@ def discover(config):
     Returns:
         A Singer Catalog object.
     """
-    client = RestClient(config)
+    # Sample requests usually all hit one host; over HTTP/2 they multiplex
+    # on a single connection instead of each opening its own
+    client = RestClient(config, http2=bool(config.get("discover_http2", False)))
     streams = config.get("streams", [])
     entries = []
 
-    for stream_config in streams:
+    # Sample fetching is pure I/O and streams are independent, so fetch
+    # and infer concurrently; catalog entries are still built in order.
+    max_workers = int(config.get("discover_concurrency", DEFAULT_DISCOVER_CONCURRENCY))
+    max_workers = max(1, min(max_workers, len(streams)))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_get_raw_schema, client, config, stream_config)
+                for stream_config in streams
+            ]
+            raw_schemas = [future.result() for future in futures]
+    finally:
+        client.close()
+
+    for stream_config, raw_schema in zip(streams, raw_schemas):
         stream_name = stream_config["name"]
         key_properties = stream_config.get("primary_keys", [])
         replication_key = stream_config.get("replication_key")
@@ -153,27 +292,6 @@ def discover(config):
         if replication_key and replication_method == "FULL_TABLE":
             replication_method = "INCREMENTAL"
 
-        LOGGER.info("Discovering stream: %s", stream_name)
-
-        # Use static schema if provided, otherwise infer
-        if "schema" in stream_config:
-            raw_schema = stream_config["schema"]
-            LOGGER.info("Using static schema for '%s'", stream_name)
-        else:
-            # Fetch sample records and infer schema
-            try:
-                sample_records = _fetch_sample_records(client, config, stream_config)
-                if not sample_records:
-                    LOGGER.warning(
-                        "No sample records for '%s', creating empty schema", stream_name
-                    )
-                    raw_schema = {"type": ["null", "object"], "properties": {}}
-                else:
-                    raw_schema = infer_schema_from_records(sample_records)
-            except Exception as e:
-                LOGGER.error("Failed to discover stream '%s': %s", stream_name, e)
-                raw_schema = {"type": ["null", "object"], "properties": {}}
-
         # Flatten/denest if enabled
         if should_denest:
             flat_schema, child_streams = build_flat_schema(
@@ -43,8 +43,9 @@ Example denesting:
 
 import json
 import logging
+import re
 from collections import OrderedDict
-from copy import deepcopy
+from itertools import islice
 
 LOGGER = logging.getLogger(__name__)
 
@@ -54,139 +55,157 @@ DENEST_SEPARATOR = "__"
 # Maximum nesting depth to flatten (prevents infinite recursion)
 MAX_DENEST_DEPTH = 10
 
+# Encoder for scalar arrays, built once rather than per json.dumps call.
+# Deliberately the stdlib encoder: its output (", " separators, ASCII
+# escapes) is the column value targets have always received.
+_encode_json = json.JSONEncoder().encode
+
+# ISO 8601 datetimes: 2024-01-15T10:30:00Z, 2024-01-15T10:30:00.000Z,
+# 2024-01-15T10:30:00+00:00, 2024-01-15 10:30:00
+_DATETIME_RE = re.compile(
+    r'^\d{4}-\d{2}-\d{2}'  # Date part
+    r'[T ]\d{2}:\d{2}:\d{2}'  # Time part
+    r'(\.\d+)?'  # Optional fractional seconds
+    r'(Z|[+-]\d{2}:?\d{2})?$'  # Optional timezone
+)
+
 
 # ----------------------------------------------------------------------
 # Type inference
 # ----------------------------------------------------------------------
 
+# Shared schemas for scalar values. Callers must treat these as read-only:
+# they are returned by _infer_type and stored in inferred schemas as-is.
+_T_NULL = {"type": ["null", "string"]}
+_T_BOOLEAN = {"type": ["null", "boolean"]}
+_T_INTEGER = {"type": ["null", "integer"]}
+_T_NUMBER = {"type": ["null", "number"]}
+_T_STRING = {"type": ["null", "string"]}
+_T_DATETIME = {"type": ["null", "string"], "format": "date-time"}
+
+# Dispatch on the exact type (bool is checked before its int base class)
+_SCALAR_TYPES = {
+    bool: _T_BOOLEAN,
+    int: _T_INTEGER,
+    float: _T_NUMBER,
+    type(None): _T_NULL,
+}
+
+
 def _infer_type(value):
     """Infer the JSON Schema type for a Python value.
 
-    Returns a dict representing the JSON Schema type.
+    Returns a dict representing the JSON Schema type. Scalar types share
+    one read-only dict per type; objects and arrays get a fresh dict.
     """
-    if value is None:
-        return {"type": ["null", "string"]}
-    elif isinstance(value, bool):
-        return {"type": ["null", "boolean"]}
-    elif isinstance(value, int):
-        return {"type": ["null", "integer"]}
-    elif isinstance(value, float):
-        return {"type": ["null", "number"]}
-    elif isinstance(value, str):
+    value_type = type(value)
+    scalar = _SCALAR_TYPES.get(value_type)
+    if scalar is not None:
+        return scalar
+    if value_type is str:
         # Check if it looks like a datetime
-        if _looks_like_datetime(value):
-            return {"type": ["null", "string"], "format": "date-time"}
-        return {"type": ["null", "string"]}
-    elif isinstance(value, dict):
+        return _T_DATETIME if _looks_like_datetime(value) else _T_STRING
+    if value_type is dict:
         return {"type": ["null", "object"], "properties": {}}
-    elif isinstance(value, list):
+    if value_type is list:
         return {"type": ["null", "array"], "items": {}}
-    else:
-        return {"type": ["null", "string"]}
+    return _T_STRING
 
 
 def _looks_like_datetime(value):
     """Check if a string looks like an ISO 8601 datetime."""
-    if not isinstance(value, str) or len(value) < 10:
+    if not isinstance(value, str) or len(value) < 10 or not value[0].isdigit():
         return False
-    # Common datetime patterns
-    # 2024-01-15T10:30:00Z, 2024-01-15T10:30:00.000Z,
-    # 2024-01-15T10:30:00+00:00, 2024-01-15 10:30:00
-    import re
-    datetime_pattern = re.compile(
-        r'^\d{4}-\d{2}-\d{2}'  # Date part
-        r'[T ]\d{2}:\d{2}:\d{2}'  # Time part
-        r'(\.\d+)?'  # Optional fractional seconds
-        r'(Z|[+-]\d{2}:?\d{2})?$'  # Optional timezone
-    )
-    return bool(datetime_pattern.match(value))
-
-
-def _merge_types(type_a, type_b):
-    """Merge two JSON Schema type definitions into a compatible union.
-
-    When two records have different types for the same field, we need
-    to produce a schema that accepts both.
-    """
-    if not type_a:
-        return type_b
-    if not type_b:
-        return type_a
-
-    # Normalize to lists
-    types_a = type_a.get("type", [])
-    types_b = type_b.get("type", [])
-    if isinstance(types_a, str):
-        types_a = [types_a]
-    if isinstance(types_b, str):
-        types_b = [types_b]
-
-    # Merge type arrays (deduplicated, preserving order)
-    merged = list(OrderedDict.fromkeys(types_a + types_b))
-
-    result = {"type": merged}
-
-    # Preserve format if both have the same format
-    if type_a.get("format") and type_a.get("format") == type_b.get("format"):
-        result["format"] = type_a["format"]
-
-    # Merge object properties recursively
-    if "object" in merged:
-        props_a = type_a.get("properties", {})
-        props_b = type_b.get("properties", {})
-        merged_props = dict(props_a)
-        for key, val in props_b.items():
-            if key in merged_props:
-                merged_props[key] = _merge_types(merged_props[key], val)
-            else:
-                merged_props[key] = val
-        if merged_props:
-            result["properties"] = merged_props
-
-    # Merge array items
-    if "array" in merged:
-        items_a = type_a.get("items", {})
-        items_b = type_b.get("items", {})
-        if items_a and items_b:
-            result["items"] = _merge_types(items_a, items_b)
-        elif items_a:
-            result["items"] = items_a
-        elif items_b:
-            result["items"] = items_b
-
-    return result
+    return _DATETIME_RE.match(value) is not None
 
 
 # ----------------------------------------------------------------------
 # Schema inference from records
 # ----------------------------------------------------------------------
 
-def infer_schema_from_records(records, max_records=500):
+class _SchemaNode:
+    """Mutable schema accumulator for one field during inference.
+
+    Observations update the node in place; to_schema() converts it to
+    a JSON Schema dict once all sample records have been seen.
+    """
+
+    __slots__ = ("types", "format", "properties", "items")
+
+    def __init__(self):
+        self.types = {}  # JSON Schema type names, in first-seen order
+        self.format = None
+        self.properties = None  # field name -> _SchemaNode, once an object is seen
+        self.items = None  # _SchemaNode for array items, once an item is seen
+
+    def add_type(self, type_names, value_format=None):
+        """Record one observed type; returns True if the node changed."""
+        changed = False
+        # A format survives only while every observation agrees on it
+        if not self.types:
+            self.format = value_format
+        elif self.format is not None and self.format != value_format:
+            self.format = None
+            changed = True
+        for name in type_names:
+            if name not in self.types:
+                self.types[name] = None
+                changed = True
+        return changed
+
+    def to_schema(self):
+        schema = {"type": list(self.types)}
+        if self.format:
+            schema["format"] = self.format
+        if self.properties is not None:
+            schema["properties"] = {
+                key: node.to_schema() for key, node in self.properties.items()
+            }
+        if "array" in self.types:
+            schema["items"] = self.items.to_schema() if self.items else {}
+        return schema
+
+
+_OBJECT_TYPE = ("null", "object")
+_ARRAY_TYPE = ("null", "array")
+
+
+def infer_schema_from_records(records, max_records=500, stability_window=None):
     """Infer a JSON Schema from a list of sample records.
 
     Scans up to max_records records and builds a schema that
     accommodates all observed field types.
 
     Args:
-        records: List of record dicts.
+        records: Iterable of record dicts (only max_records are consumed).
         max_records: Maximum number of records to analyze.
+        stability_window: If set, stop early once this many consecutive
+            records have left the schema unchanged.
 
     Returns:
         A dict representing a JSON Schema for the records.
     """
-    schema = {
-        "type": ["null", "object"],
-        "properties": {},
-    }
+    properties = {}
 
     count = 0
-    for record in records:
-        if count >= max_records:
-            break
+    unchanged = 0
+    for record in islice(records, max_records):
         if not isinstance(record, dict):
             continue
-        _observe_record(schema["properties"], record)
+        if _observe_record(properties, record):
+            unchanged = 0
+        else:
+            unchanged += 1
         count += 1
+        if stability_window and unchanged >= stability_window:
+            LOGGER.info("Schema unchanged for %d records, stopping early",
+                        unchanged)
+            break
+
+    schema = {
+        "type": ["null", "object"],
+        "properties": {key: node.to_schema() for key, node in properties.items()},
+    }
 
     LOGGER.info("Schema inferred from %d sample records, %d properties found",
                 count, len(schema["properties"]))
@@ -195,35 +214,59 @@ def infer_schema_from_records(records, max_records=500):
 
 
 def _observe_record(properties, record, depth=0):
-    """Recursively observe a record and update the schema properties."""
+    """Observe a record, updating the _SchemaNode for each of its fields.
+
+    Returns True if the record changed the schema.
+    """
     if depth > MAX_DENEST_DEPTH:
-        return
+        return False
 
+    scalar_types = _SCALAR_TYPES
+    changed = False
     for key, value in record.items():
-        inferred = _infer_type(value)
-
-        if key in properties:
-            properties[key] = _merge_types(properties[key], inferred)
+        node = properties.get(key)
+        if node is None:
+            node = properties[key] = _SchemaNode()
+        # Scalars are the common case: handle them without another call
+        scalar = scalar_types.get(type(value))
+        if scalar is not None:
+            changed |= node.add_type(scalar["type"])
         else:
-            properties[key] = inferred
+            changed |= _observe_value(node, value, depth)
+    return changed
 
-        # Recurse into nested objects
-        if isinstance(value, dict) and "properties" in properties.get(key, {}):
-            _observe_record(properties[key]["properties"], value, depth + 1)
 
-        # Recurse into array items
-        if isinstance(value, list) and value:
-            items_schema = properties[key].get("items", {})
+def _observe_value(node, value, depth):
+    """Fold one field value (at the given record depth) into its node.
+
+    Returns True if the node (or any node below it) changed.
+    """
+    # Scalars are the common case: one exact-type lookup, no isinstance
+    value_type = type(value)
+    scalar = _SCALAR_TYPES.get(value_type)
+    if scalar is not None:
+        return node.add_type(scalar["type"])
+    if value_type is str:
+        if _looks_like_datetime(value):
+            return node.add_type(_T_DATETIME["type"], _T_DATETIME["format"])
+        return node.add_type(_T_STRING["type"])
+
+    if isinstance(value, dict):
+        changed = node.add_type(_OBJECT_TYPE)
+        if node.properties is None:
+            node.properties = {}
+        # Recurse into nested objects
+        return _observe_record(node.properties, value, depth + 1) | changed
+    if isinstance(value, list):
+        changed = node.add_type(_ARRAY_TYPE)
+        if value:
+            if node.items is None:
+                node.items = _SchemaNode()
             for item in value[:10]:  # Sample first 10 items
-                if isinstance(item, dict):
-                    if "properties" not in items_schema:
-                        items_schema["properties"] = {}
-                    items_schema["type"] = ["null", "object"]
-                    _observe_record(items_schema["properties"], item, depth + 1)
-                else:
-                    item_type = _infer_type(item)
-                    items_schema = _merge_types(items_schema, item_type)
-            properties[key]["items"] = items_schema
+                changed |= _observe_value(node.items, item, depth)
+        return changed
+    inferred = _infer_type(value)
+    return node.add_type(inferred["type"], inferred.get("format"))
 
 
 # ----------------------------------------------------------------------
@@ -271,18 +314,17 @@ def identify_child_streams(schema, stream_name, key_properties):
         # Build child schema: parent FK fields + array item fields
         child_properties = OrderedDict()
 
-        # Add foreign key references to parent
+        # Add foreign key references to parent. Field schemas are never
+        # mutated once inferred, so they are shared rather than copied.
         for pk in key_properties:
-            parent_pk_schema = properties.get(pk, {"type": ["null", "string"]})
-            child_properties[f"_sdc_source_key_{pk}"] = deepcopy(parent_pk_schema)
+            child_properties[f"_sdc_source_key_{pk}"] = properties.get(pk, _T_STRING)
 
         # Add a sequence index
-        child_properties["_sdc_sequence"] = {"type": ["null", "integer"]}
+        child_properties["_sdc_sequence"] = _T_INTEGER
 
         # Add the item's own properties (flattened)
         item_props = items.get("properties", {})
-        for item_key, item_schema in item_props.items():
-            child_properties[item_key] = deepcopy(item_schema)
+        child_properties.update(item_props)
 
         child_key_props = [f"_sdc_source_key_{pk}" for pk in key_properties]
         child_key_props.append("_sdc_sequence")
@@ -306,7 +348,8 @@ def identify_child_streams(schema, stream_name, key_properties):
     return child_streams
 
 
-def flatten_record(record, parent_key="", separator=DENEST_SEPARATOR, depth=0):
+def flatten_record(record, parent_key="", separator=DENEST_SEPARATOR, depth=0,
+                   out=None):
     """Flatten a nested dict by joining keys with separator.
 
     Nested objects are flattened:
@@ -320,34 +363,45 @@ def flatten_record(record, parent_key="", separator=DENEST_SEPARATOR, depth=0):
 
     Args:
         record: The record dict to flatten.
-        parent_key: Prefix for nested keys (used in recursion).
+        parent_key: Prefix for the record's keys.
         separator: Separator between parent and child key names.
-        depth: Current recursion depth.
+        depth: Nesting depth of the record itself.
+        out: Optional dict to write the flattened fields into.
 
     Returns:
-        A flattened dict.
+        A flattened dict (out, if given).
     """
-    items = {}
+    items = {} if out is None else out
 
     if depth > MAX_DENEST_DEPTH:
         return items
 
-    for key, value in record.items():
-        new_key = f"{parent_key}{separator}{key}" if parent_key else key
-
-        if isinstance(value, dict):
-            # Recurse into nested objects
-            nested = flatten_record(value, new_key, separator, depth + 1)
-            items.update(nested)
-        elif isinstance(value, list):
-            if value and isinstance(value[0], dict):
-                # Skip arrays of objects -- they become child streams
-                continue
+    # Walk nested objects with an explicit stack of (prefix, field iterator)
+    # instead of recursing; resuming the parent's iterator after a nested
+    # object keeps the output in the same key order as the input.
+    encode_json = _encode_json
+    stack = [(parent_key, iter(record.items()))]
+    while stack:
+        prefix, fields = stack[-1]
+        for key, value in fields:
+            new_key = prefix + separator + key if prefix else key
+
+            if isinstance(value, dict):
+                # Descend into nested objects (up to MAX_DENEST_DEPTH)
+                if depth + len(stack) <= MAX_DENEST_DEPTH:
+                    stack.append((new_key, iter(value.items())))
+                    break
+            elif isinstance(value, list):
+                if value and isinstance(value[0], dict):
+                    # Skip arrays of objects -- they become child streams
+                    continue
+                else:
+                    # Arrays of scalars: JSON-serialize
+                    items[new_key] = encode_json(value) if value else None
             else:
-                # Arrays of scalars: JSON-serialize
-                items[new_key] = json.dumps(value) if value else None
+                items[new_key] = value
         else:
-            items[new_key] = value
+            stack.pop()
 
     return items
 
@@ -367,31 +421,37 @@ def flatten_schema(schema, parent_key="", separator=DENEST_SEPARATOR, depth=0):
     if depth > MAX_DENEST_DEPTH:
         return flat_properties
 
-    properties = schema.get("properties", {})
-
-    for key, field_schema in properties.items():
-        new_key = f"{parent_key}{separator}{key}" if parent_key else key
-        field_types = field_schema.get("type", [])
-        if isinstance(field_types, str):
-            field_types = [field_types]
-
-        if "object" in field_types and "properties" in field_schema:
-            # Recurse into nested objects
-            nested = flatten_schema(field_schema, new_key, separator, depth + 1)
-            flat_properties.update(nested)
-        elif "array" in field_types:
-            items = field_schema.get("items", {})
-            items_types = items.get("type", [])
-            if isinstance(items_types, str):
-                items_types = [items_types]
-            if "object" in items_types and items.get("properties"):
-                # Array of objects: skip (becomes child stream)
-                continue
+    # Same explicit-stack walk as flatten_record
+    stack = [(parent_key, iter(schema.get("properties", {}).items()))]
+    while stack:
+        prefix, fields = stack[-1]
+        for key, field_schema in fields:
+            new_key = prefix + separator + key if prefix else key
+            field_types = field_schema.get("type", [])
+            if isinstance(field_types, str):
+                field_types = [field_types]
+
+            if "object" in field_types and "properties" in field_schema:
+                # Descend into nested objects (up to MAX_DENEST_DEPTH)
+                if depth + len(stack) <= MAX_DENEST_DEPTH:
+                    stack.append((new_key, iter(field_schema["properties"].items())))
+                    break
+            elif "array" in field_types:
+                items = field_schema.get("items", {})
+                items_types = items.get("type", [])
+                if isinstance(items_types, str):
+                    items_types = [items_types]
+                if "object" in items_types and items.get("properties"):
+                    # Array of objects: skip (becomes child stream)
+                    continue
+                else:
+                    # Array of scalars: becomes a JSON string
+                    flat_properties[new_key] = _T_STRING
             else:
-                # Array of scalars: becomes a JSON string
-                flat_properties[new_key] = {"type": ["null", "string"]}
+                # Leaf schemas are read-only; share instead of copying
+                flat_properties[new_key] = field_schema
         else:
-            flat_properties[new_key] = deepcopy(field_schema)
+            stack.pop()
 
     return flat_properties
 
@@ -436,23 +496,23 @@ def extract_child_records(record, child_stream_config, key_properties):
     if not items or not isinstance(items, list):
         return []
 
+    # Parent foreign keys (and the sequence column's position) are the
+    # same for every item; build them once and copy per item
+    parent_fields = {
+        f"_sdc_source_key_{pk}": record.get(pk) for pk in key_properties
+    }
+    parent_fields["_sdc_sequence"] = None
+
     child_records = []
     for idx, item in enumerate(items):
         if not isinstance(item, dict):
             continue
 
-        child_record = OrderedDict()
-
-        # Add parent foreign keys
-        for pk in key_properties:
-            child_record[f"_sdc_source_key_{pk}"] = record.get(pk)
-
-        # Add sequence number
+        child_record = parent_fields.copy()
         child_record["_sdc_sequence"] = idx
 
-        # Flatten the child item
-        flat_item = flatten_record(item)
-        child_record.update(flat_item)
+        # Flatten the child item straight into the child record
+        flatten_record(item, out=child_record)
 
         child_records.append(child_record)
 
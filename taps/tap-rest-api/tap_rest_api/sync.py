@@ -8,14 +8,18 @@ Handles parent and child streams (denested arrays), state management,
 and configurable pagination.
 """
 
+import sys
+from datetime import datetime
 from urllib.parse import quote as url_quote
 
 import singer
+from dateutil.parser import parse as parse_dt
 from singer import Transformer, metadata, bookmarks
 
 from tap_rest_api.client import RestClient
+from tap_rest_api.discover import prepare_stream_request
 from tap_rest_api.pagination import get_paginator
-from tap_rest_api.record_extractor import extract_records
+from tap_rest_api.record_extractor import iter_records
 from tap_rest_api.schema_inference import (
     flatten_record,
     extract_child_records,
@@ -23,16 +27,37 @@ from tap_rest_api.schema_inference import (
     infer_schema_from_records,
     build_flat_schema,
 )
+from tap_rest_api.transform import make_transform
 
 LOGGER = singer.get_logger()
 
+# Records between progress log lines
+PROGRESS_LOG_INTERVAL = 10000
+
+# Records between intermediate state writes, unless state_checkpoint_pages is set
+STATE_CHECKPOINT_RECORDS = 10000
+
+# Operators tried, in order, to split a rendered bookmark_filter into key/value
+_FILTER_OPERATORS = (">=", ">", "=", "gte:", "gt:")
+
+
+def _parse_iso_datetime(value):
+    """Parse an ISO 8601 string with the C-implemented ``fromisoformat``.
+
+    A trailing ``Z`` is rewritten as ``+00:00`` since ``fromisoformat`` only
+    accepts it natively from Python 3.11. Raises ValueError otherwise.
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
 
 def _compare_replication_values(value_a, value_b):
     """Compare two replication key values correctly.
 
-    Attempts datetime parsing first (handles ISO 8601 formats),
-    then numeric comparison, falling back to string comparison.
-    Returns True if value_a > value_b.
+    Attempts ISO 8601 datetime parsing first, then numeric comparison,
+    then dateutil for other date formats, falling back to string
+    comparison. Returns True if value_a > value_b.
     """
     if value_a is None:
         return False
@@ -41,13 +66,10 @@ def _compare_replication_values(value_a, value_b):
 
     str_a, str_b = str(value_a), str(value_b)
 
-    # Try datetime comparison
+    # Try ISO 8601 datetime comparison (fast path)
     try:
-        from dateutil.parser import parse as parse_dt
-        dt_a = parse_dt(str_a)
-        dt_b = parse_dt(str_b)
-        return dt_a > dt_b
-    except (ValueError, TypeError, ImportError):
+        return _parse_iso_datetime(str_a) > _parse_iso_datetime(str_b)
+    except (ValueError, TypeError):
         pass
 
     # Try numeric comparison
@@ -56,10 +78,70 @@ def _compare_replication_values(value_a, value_b):
     except (ValueError, TypeError):
         pass
 
+    # Try datetime comparison for other common date formats
+    try:
+        return parse_dt(str_a) > parse_dt(str_b)
+    except (ValueError, TypeError, OverflowError):
+        pass
+
     # Fallback to string comparison
     return str_a > str_b
 
 
+def _make_comparator(sample_value):
+    """Return a replication key comparator specialized for ``sample_value``.
+
+    The sample is probed once (ISO 8601 datetime, then number) and the
+    returned ``compare(value_a, value_b)`` only tries that branch, caching
+    the parsed ``value_b`` since the running maximum rarely changes. Values
+    that don't fit the probed format go through
+    :func:`_compare_replication_values`, as does everything when the sample
+    is None or matches neither format.
+    """
+    if sample_value is None:
+        return _compare_replication_values
+
+    sample = str(sample_value)
+    try:
+        _parse_iso_datetime(sample)
+        parse = _parse_iso_datetime
+    except ValueError:
+        try:
+            float(sample)
+            parse = float
+        except ValueError:
+            return _compare_replication_values
+
+    last_b = [None, None]
+
+    def compare(value_a, value_b):
+        if value_a is None:
+            return False
+        if value_b is None:
+            return True
+        try:
+            if value_b != last_b[0]:
+                last_b[1] = parse(str(value_b))
+                last_b[0] = value_b
+            return parse(str(value_a)) > last_b[1]
+        except (ValueError, TypeError):
+            return _compare_replication_values(value_a, value_b)
+
+    return compare
+
+
+def _write_record(stream_name, record, time_extracted):
+    """singer.write_record, minus its flush after every message.
+
+    Records share stdout with singer's SCHEMA and STATE messages, so they
+    stay in order; stdout is flushed once per page and by every
+    SCHEMA/STATE message.
+    """
+    sys.stdout.write(singer.format_message(singer.RecordMessage(
+        stream=stream_name, record=record, time_extracted=time_extracted,
+    )) + "\n")
+
+
 def _get_selected_streams(catalog):
     """Return list of CatalogEntry objects that the user has selected."""
     selected = []
@@ -71,35 +153,30 @@ def _get_selected_streams(catalog):
     return selected
 
 
-def _find_stream_config(config, stream_name):
-    """Find the stream config dict by stream name.
-
-    Handles both parent and child streams (child names are "parent__field").
-    """
-    streams = config.get("streams", [])
+def _schema_to_dict(schema):
+    """Return a catalog entry's schema (a singer Schema or a dict) as a dict."""
+    to_dict = getattr(schema, "to_dict", None)
+    return to_dict() if to_dict is not None else schema
 
-    # Direct match
-    for sc in streams:
-        if sc["name"] == stream_name:
-            return sc
 
-    # Child stream: parent__field -> find parent config
-    if "__" in stream_name:
-        parent_name = stream_name.split("__")[0]
-        for sc in streams:
-            if sc["name"] == parent_name:
-                return sc
+def _index_stream_configs(config):
+    """Map stream name -> stream config (the first definition wins)."""
+    streams_index = {}
+    for sc in config.get("streams", []):
+        streams_index.setdefault(sc["name"], sc)
+    return streams_index
 
-    return None
 
+def _find_stream_config(streams_index, stream_name):
+    """Find the stream config dict by stream name.
 
-def _build_stream_url(config, stream_config):
-    """Build the full URL for a stream endpoint."""
-    base_url = config["api_url"].rstrip("/")
-    path = stream_config.get("path", "")
-    if path.startswith("http"):
-        return path
-    return f"{base_url}/{path.lstrip('/')}" if path else base_url
+    Handles both parent and child streams (child names are "parent__field").
+    """
+    stream_config = streams_index.get(stream_name)
+    if stream_config is None and "__" in stream_name:
+        # Child stream: parent__field -> parent config
+        stream_config = streams_index.get(stream_name.split("__")[0])
+    return stream_config
 
 
 def _build_request_params(stream_config, bookmark_value=None):
@@ -121,7 +198,7 @@ def _build_request_params(stream_config, bookmark_value=None):
                 params[filter_param] = filter_value
             else:
                 # Try to parse as key=value or key>value
-                for op in [">=", ">", "=", "gte:", "gt:"]:
+                for op in _FILTER_OPERATORS:
                     if op in filter_value:
                         parts = filter_value.split(op, 1)
                         params[parts[0].strip()] = op + parts[1].strip() if op in (">", ">=") else parts[1].strip()
@@ -144,12 +221,9 @@ def _sync_parent_stream(client, config, state, stream_name, stream_config,
     """Sync a parent stream and its child streams."""
     replication_key = stream_config.get("replication_key")
     replication_method = stream_config.get("replication_method", "FULL_TABLE")
-    records_path = stream_config.get("records_path")
     pagination_style = stream_config.get("pagination_style", "none")
     should_denest = stream_config.get("denest", True)
 
-    url = _build_stream_url(config, stream_config)
-
     # Get bookmark for incremental
     bookmark_value = None
     if replication_method == "INCREMENTAL" and replication_key:
@@ -168,6 +242,7 @@ def _sync_parent_stream(client, config, state, stream_name, stream_config,
 
     # Build request params (with bookmark injection)
     params = _build_request_params(stream_config, bookmark_value)
+    request = prepare_stream_request(config, stream_config, params)
 
     # Per-stream headers
     stream_headers = stream_config.get("headers")
@@ -176,8 +251,15 @@ def _sync_parent_stream(client, config, state, stream_name, stream_config,
     paginator = get_paginator(pagination_style)
 
     record_count = 0
+    next_progress_log = PROGRESS_LOG_INTERVAL
     child_record_counts = {name: 0 for name in child_streams_config}
     max_replication_value = bookmark_value
+    checkpointed_value = bookmark_value
+    checkpointed_records = 0
+    checkpoint_pages = stream_config.get("state_checkpoint_pages")
+    checkpoint_pages = max(1, int(checkpoint_pages)) if checkpoint_pages else None
+    pages_since_checkpoint = 0
+    compare = _make_comparator(bookmark_value) if bookmark_value else None
     extraction_time = singer.utils.now()
 
     # Write schemas for child streams
@@ -188,9 +270,20 @@ def _sync_parent_stream(client, config, state, stream_name, stream_config,
             key_properties=child_config["key_properties"],
         )
 
+    # Child streams carry no field metadata; build the empty map once
+    child_mdata_map = metadata.to_map(metadata.to_list(metadata.new()))
+
     with Transformer() as transformer:
-        for page_data in paginator(client, url, params, stream_config):
-            raw_records = extract_records(page_data, records_path)
+        # Build each stream's coercion plan once, not per record
+        transform = make_transform(transformer, schema, mdata_map)
+        child_items = [
+            (child_name, child_config,
+             make_transform(transformer, child_config["schema"], child_mdata_map))
+            for child_name, child_config in child_streams_config.items()
+        ]
+
+        for page_data in paginator(client, request.url, request.params(), stream_config):
+            raw_records = iter_records(page_data, request.records_path)
 
             for record in raw_records:
                 # Flatten the record for the parent stream
@@ -201,57 +294,69 @@ def _sync_parent_stream(client, config, state, stream_name, stream_config,
 
                 # Write parent record
                 try:
-                    transformed = transformer.transform(flat_record, schema, mdata_map)
+                    transformed = transform(flat_record)
                 except Exception as e:
                     LOGGER.warning("Transform error on record in '%s': %s. Writing raw.",
                                    stream_name, e)
                     transformed = flat_record
 
-                singer.write_record(
-                    stream_name, transformed, time_extracted=extraction_time
-                )
+                _write_record(stream_name, transformed, extraction_time)
                 record_count += 1
 
                 # Extract and write child records
-                for child_name, child_config in child_streams_config.items():
+                for child_name, child_config, child_transform in child_items:
                     child_records = extract_child_records(
                         record, child_config, key_properties
                     )
                     for child_record in child_records:
                         try:
-                            child_transformed = transformer.transform(
-                                child_record, child_config["schema"],
-                                metadata.to_map(
-                                    metadata.to_list(metadata.new())
-                                )
-                            )
+                            child_transformed = child_transform(child_record)
                         except Exception:
                             child_transformed = child_record
 
-                        singer.write_record(
-                            child_name, child_transformed,
-                            time_extracted=extraction_time
-                        )
-                        child_record_counts[child_name] = (
-                            child_record_counts.get(child_name, 0) + 1
-                        )
+                        _write_record(child_name, child_transformed, extraction_time)
+                        child_record_counts[child_name] += 1
 
                 # Track max replication key value
                 if replication_key:
-                    rep_value = flat_record.get(replication_key) or record.get(replication_key)
-                    if rep_value:
-                        if _compare_replication_values(rep_value, max_replication_value):
-                            max_replication_value = str(rep_value)
+                    rep_value = flat_record.get(replication_key)
+                    if not rep_value and flat_record is not record:
+                        rep_value = record.get(replication_key)
+                    # Equal to the current max (the common case on ordered
+                    # APIs) can never advance it; skip the comparison
+                    if rep_value and rep_value != max_replication_value:
+                        if compare is None:
+                            compare = _make_comparator(rep_value)
+                        if compare(rep_value, max_replication_value):
+                            max_replication_value = (
+                                rep_value if type(rep_value) is str else str(rep_value)
+                            )
 
-                # Log progress every 10,000 records
-                if record_count % 10000 == 0:
+                # Log progress every PROGRESS_LOG_INTERVAL records
+                if record_count == next_progress_log:
+                    next_progress_log += PROGRESS_LOG_INTERVAL
                     LOGGER.info("%s: Synced %d records so far...", stream_name, record_count)
-                    # Write intermediate state for crash recovery
-                    if max_replication_value and replication_key:
-                        state = bookmarks.write_bookmark(
-                            state, stream_name, replication_key, max_replication_value
-                        )
-                        singer.write_state(state)
+
+            # Hand the page's records downstream
+            sys.stdout.flush()
+
+            # Write intermediate state at page boundaries for crash recovery
+            pages_since_checkpoint += 1
+            if checkpoint_pages:
+                checkpoint_due = pages_since_checkpoint >= checkpoint_pages
+            else:
+                checkpoint_due = (
+                    record_count - checkpointed_records >= STATE_CHECKPOINT_RECORDS
+                )
+            if (checkpoint_due and replication_key
+                    and max_replication_value != checkpointed_value):
+                state = bookmarks.write_bookmark(
+                    state, stream_name, replication_key, max_replication_value
+                )
+                singer.write_state(state)
+                checkpointed_value = max_replication_value
+                checkpointed_records = record_count
+                pages_since_checkpoint = 0
 
     # Write final bookmark
     if replication_key and max_replication_value:
@@ -282,6 +387,7 @@ def sync(config, state, catalog):
         Updated state dict.
     """
     client = RestClient(config)
+    streams_index = _index_stream_configs(config)
     selected_streams = _get_selected_streams(catalog)
 
     if not selected_streams:
@@ -290,30 +396,27 @@ def sync(config, state, catalog):
 
     LOGGER.info("Starting sync for %d selected stream(s)", len(selected_streams))
 
-    # Build a set of all selected stream names
-    selected_names = {entry.tap_stream_id for entry in selected_streams}
-
-    # Identify parent streams (not child streams)
+    # Identify parent streams, grouping selected child streams by parent
     parent_streams = []
-    child_stream_names = set()
+    child_entries = {}
     for entry in selected_streams:
         name = entry.tap_stream_id
         if "__" in name:
             # This is a child stream -- it will be synced with its parent
-            child_stream_names.add(name)
+            child_entries.setdefault(name.split("__", 1)[0], []).append(entry)
         else:
             parent_streams.append(entry)
 
     # Sync each parent stream
     for entry in parent_streams:
         stream_name = entry.tap_stream_id
-        stream_config = _find_stream_config(config, stream_name)
+        stream_config = _find_stream_config(streams_index, stream_name)
 
         if not stream_config:
             LOGGER.warning("No config found for stream '%s', skipping", stream_name)
             continue
 
-        schema = entry.schema.to_dict() if hasattr(entry.schema, "to_dict") else entry.schema
+        schema = _schema_to_dict(entry.schema)
         mdata_map = metadata.to_map(entry.metadata)
         key_properties = stream_config.get("primary_keys", [])
         replication_key = stream_config.get("replication_key")
@@ -340,28 +443,22 @@ def sync(config, state, catalog):
 
         # Find selected child streams for this parent
         child_streams_config = {}
-        for child_entry in selected_streams:
+        for child_entry in child_entries.get(stream_name, ()):
             child_name = child_entry.tap_stream_id
-            if child_name.startswith(f"{stream_name}__") and child_name in selected_names:
-                child_schema = (
-                    child_entry.schema.to_dict()
-                    if hasattr(child_entry.schema, "to_dict")
-                    else child_entry.schema
-                )
-                # Extract the array field name from "parent__field"
-                array_key = child_name[len(stream_name) + 2:]
-                child_key_props = (
-                    child_entry.key_properties
-                    if hasattr(child_entry, "key_properties") and child_entry.key_properties
-                    else [f"_sdc_source_key_{pk}" for pk in key_properties] + ["_sdc_sequence"]
-                )
+            # Extract the array field name from "parent__field"
+            array_key = child_name[len(stream_name) + 2:]
+            child_key_props = (
+                child_entry.key_properties
+                if hasattr(child_entry, "key_properties") and child_entry.key_properties
+                else [f"_sdc_source_key_{pk}" for pk in key_properties] + ["_sdc_sequence"]
+            )
 
-                child_streams_config[child_name] = {
-                    "parent_stream": stream_name,
-                    "array_key": array_key,
-                    "schema": child_schema,
-                    "key_properties": child_key_props,
-                }
+            child_streams_config[child_name] = {
+                "parent_stream": stream_name,
+                "array_key": array_key,
+                "schema": _schema_to_dict(child_entry.schema),
+                "key_properties": child_key_props,
+            }
 
         # Sync the stream
         state, _ = _sync_parent_stream(
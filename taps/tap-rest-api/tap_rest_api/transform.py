@@ -0,0 +1,204 @@
+"""Per-stream record transforms with a precomputed coercion plan.
+
+singer's Transformer re-walks the schema for every record: it rebuilds
+field paths, re-reads each property's type list and format, and filters
+the record against the metadata map. For the flat schemas this tap
+produces, all of that is fixed per stream, so make_transform builds a
+plan once -- one coercer per top-level property -- and applies it to
+each record, with the same results as Transformer.transform.
+
+Anything the plan does not cover (nested metadata, anyOf, objects,
+arrays, singer.decimal) is handed to the Transformer, either for that
+field or for the whole record. Records that fail the plan are re-run
+through Transformer.transform so errors surface exactly as before.
+"""
+
+from singer import metadata as singer_metadata
+from singer.transform import (
+    NO_INTEGER_DATETIME_PARSING,
+    breadcrumb_path,
+    string_to_datetime,
+)
+
+_SCALAR_TYPES = frozenset(("null", "string", "integer", "number", "boolean"))
+
+# Python types that coerce to themselves under each JSON Schema type
+_EXACT_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool}
+
+# Returned by a coercer when no type in the property schema matches
+_MISMATCH = object()
+
+
+def _coerce(value, typ, is_datetime):
+    """Coerce value to one JSON Schema type, as singer's Transformer does.
+
+    Returns _MISMATCH when the value cannot be coerced to typ.
+    """
+    if typ == "null":
+        return None if value is None or value == "" else _MISMATCH
+
+    if is_datetime:
+        if value is None or value == "":
+            return _MISMATCH
+        result = string_to_datetime(value)
+        return _MISMATCH if result is None else result
+
+    if typ == "string":
+        if value is None:
+            return _MISMATCH
+        try:
+            return str(value)
+        except Exception:
+            return _MISMATCH
+
+    if typ == "integer" or typ == "number":
+        if isinstance(value, str):
+            value = value.replace(",", "")
+        try:
+            return int(value) if typ == "integer" else float(value)
+        except Exception:
+            return _MISMATCH
+
+    # boolean
+    if isinstance(value, str) and value.lower() == "false":
+        return False
+    try:
+        return bool(value)
+    except Exception:
+        return _MISMATCH
+
+
+def _scalar_coercer(types, is_datetime):
+    """Build a coercer trying each type in order (null last, like singer)."""
+    if "null" in types:
+        types = [typ for typ in types if typ != "null"] + ["null"]
+    types = tuple(types)
+
+    # A value already of the first type's Python type comes back unchanged
+    exact_type = None if is_datetime else _EXACT_TYPES.get(types[0])
+    if exact_type is not None:
+        def coerce_typed(value):
+            if type(value) is exact_type:
+                return value
+            return _coerce_types(value, types, False)
+        return coerce_typed
+
+    def coerce(value):
+        return _coerce_types(value, types, is_datetime)
+
+    return coerce
+
+
+def _coerce_types(value, types, is_datetime):
+    """Return value coerced to the first matching type, or _MISMATCH."""
+    for typ in types:
+        result = _coerce(value, typ, is_datetime)
+        if result is not _MISMATCH:
+            return result
+    return _MISMATCH
+
+
+def _delegating_coercer(transformer, schema, key):
+    """Hand one property to the Transformer (objects, arrays, anyOf, ...)."""
+    path = [key]
+
+    def coerce(value):
+        success, result = transformer.transform_recur(value, schema, path)
+        return result if success else _MISMATCH
+
+    return coerce
+
+
+def _identity(value):
+    """Untyped properties pass through unchanged."""
+    return value
+
+
+def _build_plan(transformer, schema, mdata_map):
+    """Return ({field: coercer}, {dropped field: path}), or None if unsupported."""
+    if (transformer.pre_hook is not None
+            or transformer.integer_datetime_fmt != NO_INTEGER_DATETIME_PARSING):
+        return None
+    if "anyOf" in schema or "patternProperties" in schema:
+        return None
+
+    types = schema.get("type")
+    if not isinstance(types, list):
+        types = [types]
+    if [typ for typ in types if typ != "null"][:1] != ["object"]:
+        return None
+
+    properties = schema.get("properties")
+    if not properties:
+        return None
+
+    # Top-level fields filtered out by metadata -> path reported as filtered
+    dropped = {}
+    if mdata_map:
+        for breadcrumb in mdata_map:
+            if len(breadcrumb) > 2:
+                # Nested field selection; let the Transformer filter
+                return None
+            if len(breadcrumb) != 2:
+                continue
+            if singer_metadata.get(mdata_map, breadcrumb, "inclusion") == "automatic":
+                continue
+            if (singer_metadata.get(mdata_map, breadcrumb, "selected") is False
+                    or singer_metadata.get(mdata_map, breadcrumb, "inclusion") == "unsupported"):
+                dropped[breadcrumb[1]] = breadcrumb_path(breadcrumb)
+
+    fields = {}
+    for key, prop_schema in properties.items():
+        if "anyOf" in prop_schema:
+            fields[key] = _delegating_coercer(transformer, prop_schema, key)
+            continue
+        if "type" not in prop_schema:
+            fields[key] = _identity
+            continue
+
+        prop_types = prop_schema["type"]
+        if not isinstance(prop_types, list):
+            prop_types = [prop_types]
+        prop_format = prop_schema.get("format")
+        if prop_format == "singer.decimal" or not _SCALAR_TYPES.issuperset(prop_types):
+            fields[key] = _delegating_coercer(transformer, prop_schema, key)
+        else:
+            fields[key] = _scalar_coercer(prop_types, prop_format == "date-time")
+
+    return fields, dropped
+
+
+def make_transform(transformer, schema, mdata_map=None):
+    """Return transform(record) equivalent to transformer.transform(record, schema, mdata_map).
+
+    The plan is built once here; call this once per stream, not per record.
+    """
+    plan = _build_plan(transformer, schema, mdata_map)
+    if plan is None:
+        def transform_slow(record):
+            return transformer.transform(record, schema, mdata_map)
+        return transform_slow
+
+    fields, dropped = plan
+    get_coercer = fields.get
+    removed = transformer.removed
+    filtered = transformer.filtered
+
+    def transform(record):
+        result = {}
+        for key, value in record.items():
+            if key in dropped:
+                filtered.add(dropped[key])
+                continue
+            coerce = get_coercer(key)
+            if coerce is None:
+                removed.add(key)
+                continue
+            value = coerce(value)
+            if value is _MISMATCH:
+                # Let the Transformer report the mismatch
+                return transformer.transform(record, schema, mdata_map)
+            result[key] = value
+        return result
+
+    return transform
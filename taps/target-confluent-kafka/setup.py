@@ -11,6 +11,12 @@ setup(
         "confluent-kafka>=2.3.0",
         "singer-python>=6.0.0",
     ],
+    extras_require={
+        "fast": [
+            "orjson==3.10.7",
+            "msgspec==0.18.6",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "target-confluent-kafka=target_confluent_kafka:main",
@@ -18,16 +18,80 @@ Configuration:
   auto_create_topics - Auto-create topics if they don't exist (default: true)
   key_field          - Record field to use as Kafka message key (optional)
   include_metadata   - Include _sdc metadata fields (default: false)
+  partitioner        - librdkafka key partitioner, e.g. murmur2_random to match
+                       Java producers (default: librdkafka's consistent_random)
 """
 
-import io
 import json
 import sys
 import time
 import argparse
+import threading
+from itertools import islice
+from queue import Empty, Queue
 
 import singer
 
+try:
+    # Optional C JSON codec (pip install target-confluent-kafka[fast])
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional typed decoder for RECORD messages (pip install target-confluent-kafka[fast])
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_dumps(obj):
+    """Encode a record as UTF-8 JSON bytes with the stdlib encoder."""
+    return json.dumps(obj).encode("utf-8")
+
+
+if orjson is not None:
+    def _dumps(obj):
+        """Encode a record as UTF-8 JSON bytes.
+
+        orjson rejects integers beyond 64 bits; those records fall back
+        to the stdlib encoder.
+        """
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError
+            return _json_dumps(obj)
+else:
+    _dumps = _json_dumps
+
+# orjson.loads turns integers beyond 64 bits into floats, so lines are
+# parsed with msgspec (exact) when it is installed, else the stdlib
+if msgspec is not None:
+    _loads = msgspec.json.decode
+    _LOAD_ERRORS = (ValueError, msgspec.DecodeError)
+
+    class _RecordMessage(msgspec.Struct, tag_field="type", tag="RECORD"):
+        """A Singer RECORD message (version, time_extracted are ignored)."""
+        stream: str
+        record: dict
+
+    _decode_record = msgspec.json.Decoder(_RecordMessage).decode
+else:
+    def _reject_constant(name):
+        """Refuse NaN/Infinity so those lines take the stdlib fallback."""
+        raise ValueError(f"Non-standard JSON constant: {name}")
+
+    _strict_decoder = json.JSONDecoder(parse_constant=_reject_constant)
+
+    def _loads(line):
+        """Parse one JSON line (bytes or str), rejecting NaN/Infinity."""
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        return _strict_decoder.decode(line)
+
+    _LOAD_ERRORS = (ValueError,)
+    _decode_record = None
+
 LOGGER = singer.get_logger()
 
 REQUIRED_CONFIG_KEYS = ["bootstrap_servers"]
@@ -42,6 +106,129 @@ DEFAULT_CONFIG = {
     "include_metadata": False,
 }
 
+# Bytes requested per stdin read; a read returns whatever is already buffered
+READ_CHUNK_BYTES = 64 * 1024
+TEXT_BATCH_LINES = 500
+
+# Records buffered per topic before they are handed to the producer in one pass
+PRODUCE_BATCH_SIZE = 500  # per topic
+PRODUCE_BATCH_BYTES = 1024 * 1024  # across all topics
+
+
+def _line_chunks(input_stream, chunk_bytes=READ_CHUNK_BYTES):
+    """Yield lists of complete lines from ``input_stream`` as they arrive.
+
+    Binary streams are read with ``read1`` so a slow upstream tap never
+    holds back lines that are already available. Other line iterables
+    (no ``read1``) are passed through in batches of ``TEXT_BATCH_LINES``.
+    """
+    read1 = getattr(input_stream, "read1", None)
+    if read1 is None:
+        lines = iter(input_stream)
+        yield from iter(lambda: list(islice(lines, TEXT_BATCH_LINES)), [])
+        return
+
+    partial = []
+    while True:
+        chunk = read1(chunk_bytes)
+        if not chunk:
+            break
+        if b"\n" not in chunk:
+            partial.append(chunk)
+            continue
+        if partial:
+            partial.append(chunk)
+            chunk = b"".join(partial)
+            partial = []
+        lines = chunk.split(b"\n")
+        tail = lines.pop()
+        if tail:
+            partial.append(tail)
+        yield lines
+    if partial:
+        yield [b"".join(partial)]
+
+
+def _read_ahead(input_stream):
+    """Yield input lines while the next chunk is read in the background.
+
+    Reading stdin overlaps with parsing and producing the current chunk
+    instead of stalling them. Lines are still yielded in order. The
+    reader is a daemon thread, so an error while producing surfaces
+    at once instead of waiting for a read blocked on an idle upstream.
+    """
+    chunks = _line_chunks(input_stream)
+    queue = Queue(maxsize=1)
+    stop = threading.Event()
+
+    def read():
+        try:
+            for lines in chunks:
+                queue.put(lines)
+                if stop.is_set():
+                    return
+        except Exception as exc:
+            queue.put(exc)
+        else:
+            queue.put(None)
+
+    threading.Thread(target=read, name="stdin-read-ahead", daemon=True).start()
+    try:
+        while True:
+            lines = queue.get()
+            if lines is None:
+                return
+            if isinstance(lines, Exception):
+                raise lines
+            yield from lines
+    finally:
+        # Unblock a reader waiting on a full queue so it can exit
+        stop.set()
+        try:
+            queue.get_nowait()
+        except Empty:
+            pass
+
+
+def _make_metadata_stripper():
+    """Return strip(record), dropping Singer ``_sdc_`` fields for one stream.
+
+    Records from a stream almost always share the same keys in the same
+    order, so the ``_sdc_`` scan runs once per record shape rather than
+    once per record. Records with no ``_sdc_`` fields are returned as is.
+    """
+    shape = None
+    clean_keys = None  # None: the current shape has no _sdc_ fields
+
+    def strip(record):
+        nonlocal shape, clean_keys
+        keys = tuple(record)
+        if keys != shape:
+            shape = keys
+            clean_keys = tuple(k for k in keys if not k.startswith("_sdc_"))
+            if len(clean_keys) == len(keys):
+                clean_keys = None
+        if clean_keys is None:
+            return record
+        return {k: record[k] for k in clean_keys}
+
+    return strip
+
+
+def _key_bytes(value):
+    """Encode one message key part, as ``str(value).encode("utf-8")`` would."""
+    value_type = type(value)
+    if value_type is str:
+        return value.encode("utf-8")
+    if value_type is int:
+        return b"%d" % value
+    return str(value).encode("utf-8")
+
+
+def _keep_metadata(record):
+    """Return ``record`` unchanged (``include_metadata`` is set)."""
+    return record
+
 
 class KafkaTarget:
     """Singer target that produces records to Kafka."""
@@ -55,10 +242,15 @@ class KafkaTarget:
 
         self.schemas = {}
         self.key_properties = {}
+        self._stream_ctx = {}  # stream -> (topic, key property tuple, cleaner)
         self.record_count = 0
         self.state = None
         self.producer = None
 
+        # Records serialized but not yet handed to the producer
+        self._pending = {}  # topic -> ([keys], [values])
+        self._pending_bytes = 0
+
     def _get_producer(self):
         """Lazy-initialize the Kafka producer."""
         if self.producer is not None:
@@ -77,10 +269,15 @@ class KafkaTarget:
             "bootstrap.servers": self.config["bootstrap_servers"],
             "delivery.timeout.ms": self.config["delivery_timeout"],
             "compression.type": self.config["compression_type"],
-            "linger.ms": 50,
-            "batch.num.messages": 500,
+            "linger.ms": 100,
+            "batch.num.messages": 10000,
+            "batch.size": 1024 * 1024,
         }
 
+        # Keyed messages are hashed to a partition inside librdkafka
+        if self.config.get("partitioner"):
+            producer_config["partitioner"] = self.config["partitioner"]
+
         # Security settings
         security = self.config.get("security_protocol", "PLAINTEXT")
         if security != "PLAINTEXT":
@@ -110,74 +307,101 @@ class KafkaTarget:
         """Build topic name from stream name."""
         return f"{self.topic_prefix}{stream_name}"
 
+    def _stream_context(self, stream):
+        """Build and cache the per-stream topic, key properties and record cleaner."""
+        context = (
+            self._topic_name(stream),
+            tuple(self.key_properties.get(stream, ())),
+            _keep_metadata if self.include_metadata else _make_metadata_stripper(),
+        )
+        self._stream_ctx[stream] = context
+        return context
+
     def process_schema(self, message):
         """Handle a SCHEMA message."""
         stream = message["stream"]
         self.schemas[stream] = message.get("schema", {})
         self.key_properties[stream] = message.get("key_properties", [])
+        self._stream_context(stream)
         LOGGER.info(
             "Schema received for stream '%s' (keys: %s)",
             stream,
             self.key_properties[stream],
         )
 
-    def process_record(self, message):
-        """Handle a RECORD message — produce to Kafka."""
-        stream = message["stream"]
-        record = message["record"]
+    def _produce_pending(self, topic=None):
+        """Hand buffered records to the producer a topic at a time, then poll once.
 
-        if not self.include_metadata:
-            # Strip Singer metadata fields
-            record = {
-                k: v for k, v in record.items() if not k.startswith("_sdc_")
-            }
+        Drains only ``topic`` when given, otherwise every topic.
+        """
+        if not self._pending:
+            return
 
-        topic = self._topic_name(stream)
+        topics = [topic] if topic is not None else list(self._pending)
+        producer = self._get_producer()
+        produce = producer.produce
+        callback = self._delivery_callback
+        for topic in topics:
+            keys, values = self._pending.pop(topic)
+            self._pending_bytes -= sum(map(len, values))
+            for key, value in zip(keys, values):
+                try:
+                    produce(topic=topic, key=key, value=value, callback=callback)
+                except BufferError:
+                    # Local queue is full, flush and retry
+                    LOGGER.warning("Producer buffer full, flushing...")
+                    producer.flush(timeout=10)
+                    produce(topic=topic, key=key, value=value, callback=callback)
+
+        producer.poll(0)  # trigger delivery callbacks without blocking
+
+    def process_record(self, message, dumps=_dumps):
+        """Handle a RECORD message — produce to Kafka."""
+        self._write_record(message["stream"], message["record"], dumps)
+
+    def _write_record(self, stream, record, dumps=_dumps):
+        """Buffer one record for its stream's topic."""
+        topic, key_props, clean_record = (
+            self._stream_ctx.get(stream) or self._stream_context(stream)
+        )
+        record = clean_record(record)
 
         # Build message key from key_properties or key_field
         key = None
-        key_props = self.key_properties.get(stream, [])
         if self.key_field and self.key_field in record:
-            key = str(record[self.key_field])
+            key = _key_bytes(record[self.key_field])
         elif key_props:
-            key_parts = [str(record.get(k, "")) for k in key_props]
-            key = "|".join(key_parts)
-
-        producer = self._get_producer()
-        try:
-            producer.produce(
-                topic=topic,
-                key=key.encode("utf-8") if key else None,
-                value=json.dumps(record).encode("utf-8"),
-                callback=self._delivery_callback,
-            )
-        except BufferError:
-            # Local queue is full, flush and retry
-            LOGGER.warning("Producer buffer full, flushing...")
-            producer.flush(timeout=10)
-            producer.produce(
-                topic=topic,
-                key=key.encode("utf-8") if key else None,
-                value=json.dumps(record).encode("utf-8"),
-                callback=self._delivery_callback,
-            )
-
+            key = b"|".join([_key_bytes(record.get(k, "")) for k in key_props])
+
+        value = dumps(record)
+        buffer = self._pending.get(topic)
+        if buffer is None:
+            buffer = self._pending[topic] = ([], [])
+        keys, values = buffer
+        keys.append(key or None)
+        values.append(value)
+        self._pending_bytes += len(value)
         self.record_count += 1
 
-        # Periodic flush and poll
+        if len(values) >= PRODUCE_BATCH_SIZE:
+            self._produce_pending(topic)
+        elif self._pending_bytes >= PRODUCE_BATCH_BYTES:
+            self._produce_pending()
+
+        # Periodic flush
         if self.record_count % self.flush_interval == 0:
-            producer.flush(timeout=10)
+            self._produce_pending()
+            self.producer.flush(timeout=10)
             LOGGER.info(
                 "Flushed %d records to Kafka", self.record_count
             )
-        elif self.record_count % 100 == 0:
-            producer.poll(0)  # trigger delivery callbacks without blocking
 
     def process_state(self, message):
         """Handle a STATE message."""
         self.state = message.get("value", message)
 
         # Flush pending records before emitting state
+        self._produce_pending()
         if self.producer:
             self.producer.flush(timeout=10)
 
@@ -186,7 +410,8 @@ class KafkaTarget:
 
     def run(self, input_stream=None):
         """Main processing loop — read Singer messages from stdin."""
-        input_stream = input_stream or io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+        # Lines stay bytes; the JSON parser decodes UTF-8 itself
+        input_stream = input_stream or sys.stdin.buffer
 
         LOGGER.info(
             "Starting target-confluent-kafka (brokers: %s, prefix: '%s')",
@@ -196,23 +421,47 @@ class KafkaTarget:
 
         start_time = time.time()
 
-        for line in input_stream:
-            line = line.strip()
-            if not line:
+        for line in _read_ahead(input_stream):
+            if not line or line.isspace():
                 continue
 
+            # Typed fast path for RECORD lines; anything else is parsed below
+            if _decode_record is not None:
+                try:
+                    record_message = _decode_record(line)
+                except msgspec.DecodeError:
+                    pass
+                else:
+                    # msgspec keeps integers beyond 64 bits exact; orjson
+                    # cannot encode them, so _dumps hands those records to
+                    # the stdlib encoder (NaN/Infinity never get here --
+                    # msgspec rejects them and the line is parsed below)
+                    self._write_record(
+                        record_message.stream, record_message.record, _dumps
+                    )
+                    continue
+
+            # Records only the stdlib parser accepts (NaN, Infinity, as
+            # singer writes them) are re-encoded by it too
+            dumps = _dumps
             try:
-                message = json.loads(line)
-            except json.JSONDecodeError:
-                LOGGER.warning("Skipping non-JSON line: %s", line[:200])
-                continue
+                message = _loads(line)
+            except _LOAD_ERRORS:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    if isinstance(line, bytes):
+                        line = line.decode("utf-8", errors="replace")
+                    LOGGER.warning("Skipping non-JSON line: %s", line.strip()[:200])
+                    continue
+                dumps = _json_dumps
 
             msg_type = message.get("type", "").upper()
 
             if msg_type == "SCHEMA":
                 self.process_schema(message)
             elif msg_type == "RECORD":
-                self.process_record(message)
+                self.process_record(message, dumps)
             elif msg_type == "STATE":
                 self.process_state(message)
             elif msg_type == "ACTIVATE_VERSION":
@@ -221,6 +470,7 @@ class KafkaTarget:
                 LOGGER.warning("Unknown message type: %s", msg_type)
 
         # Final flush
+        self._produce_pending()
         if self.producer:
             LOGGER.info("Final flush — %d total records", self.record_count)
             self.producer.flush(timeout=30)